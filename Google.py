@@ -1,16 +1,30 @@
 from urllib.parse import quote_plus
-from scrapy import Selector
 import concurrent.futures
 from Utils import *
-import requests
-import json
 import os
 import time
 import datetime
 from credit_tracker import CorrectedCreditTracker
+from http_pool import SessionPool
+from async_engine import AsyncCrawler
+from concurrency import AIMDController
+from scheduler import RequestScheduler, SlotDispatcher
+from response_cache import DetailCache, detail_cid
+from replay import HttpArchive
+from extraction import (extract_details, selector_details, load_schema, parse_tree, bytes_selector,
+                        GEOCODED_COLUMNS, SELECTOR_COLUMNS)
+from listing_scan import scan_cids, dom_cids, scan_next_page
+from parse_pool import ParsePool
+from cid_index import SeenIndex
+from streaming import MarkerWatch
+from circuit_breaker import BreakerRegistry
+from geocode_store import GeocodeStore
+from address_parser import parse_address, address_key
+from singleflight import SingleFlight
+import atexit
 import threading
+import queue
 import random
-from time import monotonic
 
 
 UA_POOL = [
@@ -19,62 +33,172 @@ UA_POOL = [
 	"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36",
 ]
 
-GEOCODE_CACHE_PATH = "geocode_cache.json"
-_cache_lock = threading.Lock()
-try:
-	with open(GEOCODE_CACHE_PATH, "r", encoding="utf-8") as f:
-		GEOCODE_CACHE = json.load(f)
-except Exception:
-	GEOCODE_CACHE = {}
-
-_last_geocode_ts = 0.0
-
-def geocode_with_cache(address):
-	global _last_geocode_ts
-	with _cache_lock:
-		cached = GEOCODE_CACHE.get(address)
-		if cached is not None:
-			return cached
-
-	# simple rate limit
-	now = monotonic()
-	wait = _last_geocode_ts + GEOCODE_MIN_INTERVAL - now
-	if wait > 0:
-		time.sleep(wait)
-
-	# retry with backoff + jitter
+# Block pages say so near the top; matched against the lowercased first bytes, never a decoded body
+BLOCK_MARKERS = (b"unusual traffic", b"sorry")
+BLOCK_SCAN_BYTES = 600
+
+HTTP_ARCHIVE = None
+if REPLAY_MODE in ("record", "replay"):
+	HTTP_ARCHIVE = HttpArchive(REPLAY_ARCHIVE, REPLAY_MODE)
+	atexit.register(HTTP_ARCHIVE.close)
+	# Cache hits would never reach the archive, and replay needs no proxy or pacing
+	DETAIL_CACHE_ENABLED = 0
+	if REPLAY_MODE == "replay":
+		proxy = 0
+		HOST_RATE = PROXY_RATE = GEOCODE_RATE = 0
+
+SESSION_POOL = SessionPool(POOL_CONNECTIONS, POOL_MAXSIZE, HTTP_ARCHIVE)
+
+DETAIL_CACHE = None
+if DETAIL_CACHE_ENABLED:
+	DETAIL_CACHE = DetailCache(DETAIL_CACHE_PATH, DETAIL_CACHE_TTL_HOURS, DETAIL_CACHE_MAX_MB)
+
+SCHEDULER = RequestScheduler(HOST_RATE, HOST_BURST, PROXY_RATE, PROXY_BURST)
+SCHEDULER.limit_host(G_URL, GEOCODE_RATE, GEOCODE_BURST)
+
+if ADAPTIVE_CONCURRENCY:
+	CONCURRENCY = AIMDController(MAX_WORKERS, AIMD_MIN_WORKERS, AIMD_MAX_WORKERS,
+	                             AIMD_INCREASE, AIMD_DECREASE, AIMD_COOLDOWN)
+else:
+	# Fixed limit: min == max keeps MAX_WORKERS for the whole run
+	CONCURRENCY = AIMDController(MAX_WORKERS, MAX_WORKERS, MAX_WORKERS)
+
+SCHEMA = None
+if PARSER == "lxml":
+	try:
+		SCHEMA = load_schema(EXTRACTION_SCHEMA)
+	except (OSError, ValueError, KeyError) as e:
+		print(f"[SCHEMA] Could not load {EXTRACTION_SCHEMA}: {e} - using the Selector parser")
+		PARSER = "selector"
+
+if CRAWL_MODE != "detail" and not (SCHEMA and SCHEMA.cards):
+	print(f"[CARDS] crawl_mode '{CRAWL_MODE}' needs the lxml parser and a schema with a cards section - using detail")
+	CRAWL_MODE = "detail"
+
+# Column sets hybrid mode has already warned about (one warning per run, not per county)
+CARD_GAP_WARNINGS = set()
+
+PARSE_POOL = None
+if PARSE_PROCESSES > 0:
+	PARSE_POOL = ParsePool(PARSE_PROCESSES, PARSER, SCHEMA)
+	atexit.register(PARSE_POOL.close)
+
+BREAKERS = BreakerRegistry(BREAKER_FAILURES, BREAKER_RECOVERY, BREAKER_HALF_OPEN_PROBES, BREAKER_CLOSE_AFTER)
+
+# The old full-rewrite JSON cache is imported into the store on first run; entries are keyed by the
+# canonical address, so "123 Main Street" and "123 MAIN ST." share one paid lookup
+GEOCODE_CACHE = GeocodeStore(GEOCODE_CACHE_PATH, "geocode_cache.json", GEOCODE_FLUSH_EVERY, GEOCODE_FLUSH_SECONDS,
+                             key=address_key)
+atexit.register(GEOCODE_CACHE.close)
+
+# Workers asking for the same address or URL at once share the first caller's request
+GEOCODE_FLIGHTS = SingleFlight("geocode")
+FETCH_FLIGHTS = SingleFlight("fetch")
+
+def geocode_with_cache(address, credit_tracker=None, reserved=False):
+	cached = GEOCODE_CACHE.get(address)
+	if cached is not None:
+		return cached
+	return GEOCODE_FLIGHTS.do(address_key(address), _geocode_request, address, credit_tracker, reserved)
+
+
+def _geocode_request(address, credit_tracker=None, reserved=False):
+	# A flight for this address may have landed between the cache miss and now
+	if address in GEOCODE_CACHE:
+		return GEOCODE_CACHE.get(address)
+
+	# Quoted, or a "#12" unit would cut the query short as a URL fragment
+	url = G_URL.format(quote_plus(address))
+	proxies = proxyDict if proxy == 1 else None
 	for attempt in range(MAX_ATTEMPTS):
+		backoff = (BACKOFF_BASE ** (attempt + 1)) + random.uniform(*JITTER_RANGE)
 		try:
-			r = requests.get(G_URL.format(address), headers=headers, proxies=proxyDict, timeout=30)
+			# The maps host has its own bucket (geocode_rate/geocode_burst) shared by every thread,
+			# so waiting geocodes get evenly spaced slots instead of firing together. The first
+			# attempt may already hold a slot from Scraper.reserve_geocode()
+			if not (reserved and attempt == 0):
+				SCHEDULER.wait(url, proxies)
+			r = SESSION_POOL.get(url, headers=headers, proxies=proxies, timeout=30)
+			# Track PacketStream usage (REAL COSTS); API quota is tracked in geocode_record
+			if proxies and credit_tracker:
+				credit_tracker.track_packetstream_request(r.wire_bytes, len(r.content))
 			data = r.json()
-			comps = data.get("results", [{}])[0].get("address_components", [])
-			
-			# Track Google Maps API usage (FREE, just quota)
-			# Note: We need to access the credit_tracker from the Scraper instance
-			# This will be handled in the get_data method
-			
-			with _cache_lock:
-				GEOCODE_CACHE[address] = comps
-				try:
-					with open(GEOCODE_CACHE_PATH, "w", encoding="utf-8") as f:
-						json.dump(GEOCODE_CACHE, f, indent=2, ensure_ascii=False, sort_keys=True)
-						f.write("\n")
-				except Exception:
-					pass
-			return comps
 		except Exception:
-			time.sleep((BACKOFF_BASE ** (attempt + 1)) + random.uniform(*JITTER_RANGE))
+			time.sleep(backoff)
+			continue
+
+		status = data.get("status")
+		if status in ("OK", "ZERO_RESULTS"):
+			# ZERO_RESULTS is an answer too: cache it rather than paying for it again
+			results = data.get("results") or [{}]
+			comps = results[0].get("address_components", [])
+			GEOCODE_CACHE.put(address, comps)
+			return comps
+		if status == "OVER_QUERY_LIMIT":
+			# Concurrent OVER_QUERY_LIMITs don't stack: a pause only ever moves the deadline later
+			print(f"[GEOCODE] OVER_QUERY_LIMIT - holding every geocode back {backoff:.1f}s")
+			SCHEDULER.pause(url, backoff)
+			continue
+		if status in ("REQUEST_DENIED", "INVALID_REQUEST"):
+			print(f"[GEOCODE] {status}: {data.get('error_message', '')}")
+			return []
+		time.sleep(backoff)
 	return []
 
 
+def project_fields(fields):
+	"""Known output columns from a list or comma-separated string; None for all"""
+	if not fields:
+		return None
+	if isinstance(fields, str):
+		fields = fields.split(",")
+	known = {c.lower(): c for c in (SCHEMA.columns if SCHEMA else SELECTOR_COLUMNS)}
+	projected = []
+	for name in fields:
+		column = known.get(name.strip().lower())
+		if column and column not in projected:
+			projected.append(column)
+		elif not column and name.strip():
+			print(f"[FIELDS] Unknown column '{name.strip()}' ignored (known: {', '.join(known.values())})")
+	return projected or None
+
+
 class Scraper:
 
-    def __init__(self, keyword, filenm, latitude=None, longitude=None, credit_tracker=None):
+    def __init__(self, keyword, filenm, latitude=None, longitude=None, credit_tracker=None, seen=None,
+                 fields=None):
         self.search_terms = keyword
         self.search_loc = keyword.split(" in ")[-1].strip()
         self.filenm = filenm
         self.cmp = []
-        self.check_dup = []
+        # Shared across counties when main passes one in; otherwise this search only
+        self.seen = seen if seen is not None else SeenIndex()
+        self.listing_cards = 0
+        # Output column projection: None keeps every column
+        self.fields = project_fields(fields)
+        self.geocode = self.fields is None or any(c in self.fields for c in GEOCODED_COLUMNS)
+        self.extract_columns = None
+        if self.fields is not None:
+            # Name tells a real page from an empty one; the geocoder needs the page's
+            # address even when only City/State/Zip are kept
+            self.extract_columns = set(self.fields) | {"Name"} | ({"Address"} if self.geocode else set())
+        # Listing-card records by detail URL, waiting for get_data (cards/hybrid modes)
+        self.crawl_mode = CRAWL_MODE
+        self.card_records = {}
+        self.card_columns = [c for c in ((self.extract_columns or SCHEMA.columns) if SCHEMA else ())
+                             if c not in GEOCODED_COLUMNS]
+        self.card_stats = {"cards": 0, "details": 0}
+        # Every record gets the same columns in the same order whatever the crawl mode, so a card
+        # without Hours still has an (empty) Hours column and the CSV/XLSX layout never shifts
+        self.output_columns = self.fields if self.fields is not None else list(
+            SCHEMA.columns if SCHEMA else SELECTOR_COLUMNS)
+        if self.crawl_mode == "hybrid":
+            self.warn_card_gaps()
+        # Columns the geocoder fills for this projection; the parsed street only matters if Address is kept
+        self.geocode_columns = [c for c in GEOCODED_COLUMNS if self.fields is None or c in self.fields]
+        self.geocode_street = self.fields is None or "Address" in self.fields
+        self.geocode_stats = {"offline": 0, "api": 0}
+        self._stats_lock = threading.Lock()
         # Store coordinates for location-based searches
         self.latitude = latitude or 40.4173  # Default to Ohio center if not provided
         self.longitude = longitude or -82.9071  # Default to Ohio center if not provided
@@ -98,22 +222,21 @@ class Scraper:
         print(f"[LOCATION] Location Coordinates -> Lat: {self.latitude}, Lng: {self.longitude}")
         
         start_time = time.time()
-        page_start_time = start_time
         
         # Use location-based search URL with coordinates
         search_url = self.get_location_based_search_url()
-        response = self.get_response(search_url)
+        body = self.get_body(search_url)
         
         pg = 1
         while True:
-            page_start_time = time.time()
             print(f"\n[PAGE] Scraping Page # {pg} at {datetime.datetime.now().strftime('%H:%M:%S')}")
             
             try:
-                links = self.get_listings(self.search_terms, response)
-                print(f"[SUCCESS] Found {len(links)} business links on page {pg}")
+                links = self.get_listings(self.search_terms, body)
+                print(f"[SUCCESS] Found {len(links)} business links on page {pg}"
+                      f"{self.duplicate_cards_note(links)}")
                 
-                if not links:
+                if not self.listing_cards:
                     print("[WARNING] No links found - page might be empty or blocked")
                     break
                 
@@ -125,16 +248,11 @@ class Scraper:
                 print(f"[SUCCESS] Data saved - Total businesses so far: {len(self.cmp)}")
                 
                 pg += 1
-                nxt_page = response.xpath("//a[contains(@id, 'pnnext')]/@href").get()
+                nxt_page = self.next_page_url(body)
                 
                 if nxt_page:
-                    print(f"[NEXT] Moving to next page...")
-                    response = self.get_response("https://www.google.com"+nxt_page)
-                    
-                    # Add delay between pages
-                    delay = 2
-                    print(f"[WAIT] Waiting {delay} seconds before next page...")
-                    time.sleep(delay)
+                    print("[NEXT] Moving to next page...")
+                    body = self.get_body(nxt_page)
                 else:
                     print("[COMPLETE] No more pages found - search complete")
                     break
@@ -146,6 +264,7 @@ class Scraper:
         
         total_time = time.time() - start_time
         print(f"\n[FINISH] COMPLETED: {len(self.cmp)} businesses in {total_time:.1f} seconds")
+        SESSION_POOL.print_stats()
 
     def start_and_return_data(self):
         """NEW METHOD: Start scraping and return data without saving files"""
@@ -153,64 +272,113 @@ class Scraper:
         print(f"[LOCATION] Location Coordinates -> Lat: {self.latitude}, Lng: {self.longitude}")
         
         start_time = time.time()
-        page_start_time = start_time
+        if ENGINE == "async":
+            AsyncCrawler(self, ASYNC_CONCURRENCY).run()
+        else:
+            self.crawl_threaded()
         
-        # Use location-based search URL with coordinates
-        search_url = self.get_location_based_search_url()
-        response = self.get_response(search_url)
+        total_time = time.time() - start_time
+        print(f"\n[FINISH] COMPLETED: {len(self.cmp)} businesses in {total_time:.1f} seconds")
+        SESSION_POOL.print_stats()
+        SCHEDULER.print_stats()
+        CONCURRENCY.print_stats()
+        BREAKERS.print_stats()
+        self.print_card_stats()
+        self.print_geocode_stats()
+        GEOCODE_CACHE.print_stats()
+        GEOCODE_FLIGHTS.print_stats()
+        FETCH_FLIGHTS.print_stats()
+        if PARSE_POOL:
+            PARSE_POOL.print_stats()
+        if SCHEMA:
+            SCHEMA.print_stats()
+        if DETAIL_CACHE:
+            DETAIL_CACHE.print_stats()
+        if HTTP_ARCHIVE:
+            HTTP_ARCHIVE.print_stats()
         
-        pg = 1
-        while True:
-            page_start_time = time.time()
-            print(f"\n[PAGE] Scraping Page # {pg} at {datetime.datetime.now().strftime('%H:%M:%S')}")
-            
-            try:
-                links = self.get_listings(self.search_terms, response)
-                print(f"[SUCCESS] Found {len(links)} business links on page {pg}")
-                
-                if not links:
+        # Return the collected data instead of saving
+        return self.get_data_only()
+
+    def page_producer(self, pages: queue.Queue):
+        """Walk the pnnext chain ahead of the detail fetches.
+
+        Puts (page number, detail links) on ``pages`` and a final None. The
+        queue's maxsize bounds how many pages run ahead of the detail work.
+        """
+        try:
+            body = self.get_body(self.get_location_based_search_url())
+            pg = 1
+            while True:
+                links = self.get_listings(self.search_terms, body)
+                print(f"[SUCCESS] Found {len(links)} business links on page {pg}"
+                      f"{self.duplicate_cards_note(links)}")
+                if not self.listing_cards:
                     print("[WARNING] No links found - page might be empty or blocked")
                     break
-                
-                with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    executor.map(self.get_data, links, chunksize=1)
-                
-                print(f"[SUCCESS] Data collected - Total businesses so far: {len(self.cmp)}")
-                
+                nxt_page = self.next_page_url(body)
+                pages.put((pg, links))
+                if not nxt_page:
+                    print("[COMPLETE] No more pages found - search complete")
+                    break
                 pg += 1
-                time.sleep(random.uniform(*PAGE_DELAY_RANGE))
                 if pg % LONG_PAUSE_EVERY_PAGES == 0:
-                    pause = random.uniform(*LONG_PAUSE_RANGE)
-                    print(f"[PAUSE] Cooling down for {pause:.1f}s")
-                    time.sleep(pause)
-                nxt_page = response.xpath("//a[contains(@id, 'pnnext')]/@href").get()
-                
-                if nxt_page:
-                    print(f"[NEXT] Moving to next page...")
-                    response = self.get_response("https://www.google.com"+nxt_page)
-                    
-                    # Add delay between pages
-                    delay = 2
-                    print(f"[WAIT] Waiting {delay} seconds before next page...")
-                    time.sleep(delay)
-                else:
-                    print("[COMPLETE] No more pages found - search complete")
+                    self.cool_down(random.uniform(*LONG_PAUSE_RANGE))
+                print(f"[NEXT] Prefetching page {pg}...")
+                body = self.get_body(nxt_page)
+        except Exception as e:
+            print(f"[ERROR] Error fetching results pages: {e}")
+            print(f"[TIME] Error time: {datetime.datetime.now().strftime('%H:%M:%S')}")
+        finally:
+            pages.put(None)
+
+    def crawl_threaded(self):
+        """Fetch details on a thread pool while the next results pages are prefetched.
+
+        A page's detail fetches are submitted as soon as the page arrives, so
+        workers never sit idle behind the slowest detail of the previous page.
+        Each fetch reserves its pacing slot up front and only reaches a worker
+        when the slot arrives. At most PREFETCH_PAGES pages may have details
+        outstanding.
+        """
+        pages = queue.Queue(maxsize=max(1, PREFETCH_PAGES))
+        producer = threading.Thread(target=self.page_producer, args=(pages,), daemon=True)
+        producer.start()
+
+        pending_pages = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=CONCURRENCY.maximum) as executor:
+            dispatcher = SlotDispatcher(executor)
+            while True:
+                item = pages.get()
+                if item is None:
                     break
-                    
+                pg, links = item
+                print(f"\n[PAGE] Scraping Page # {pg} at {datetime.datetime.now().strftime('%H:%M:%S')}")
+                pending_pages.append((pg, [self.submit_detail(dispatcher, link) for link in links]))
+                while len(pending_pages) > max(1, PREFETCH_PAGES):
+                    self._finish_page(*pending_pages.pop(0))
+            for pending in pending_pages:
+                self._finish_page(*pending)
+            dispatcher.close()
+        producer.join()
+
+    def submit_detail(self, dispatcher, url):
+        """Future for get_data(url), started on a worker only once its paced send slot arrives"""
+        if not self.needs_detail(url):
+            return dispatcher.submit(0, self.get_data, url)
+        return dispatcher.submit(self.reserve_request(url), self.get_data, url, True)
+
+    def _finish_page(self, pg, futures):
+        for future in futures:
+            try:
+                future.result()
             except Exception as e:
                 print(f"[ERROR] Error on page {pg}: {e}")
-                print(f"[TIME] Error time: {datetime.datetime.now().strftime('%H:%M:%S')}")
-                break
-        
-        total_time = time.time() - start_time
-        print(f"\n[FINISH] COMPLETED: {len(self.cmp)} businesses in {total_time:.1f} seconds")
-        
-        # Return the collected data instead of saving
-        return self.get_data_only()
+        print(f"[SUCCESS] Page {pg} collected - Total businesses so far: {len(self.cmp)}")
 
     def get_location_based_search_url(self):
         """Generate a search URL with coordinates for more accurate local results"""
-        base_url = 'https://www.google.com/search'
+        base_url = f'{GOOGLE_BASE_URL}/search'
         params = {
             'q': self.search_terms,
             'npsic': '0',
@@ -225,104 +393,248 @@ class Scraper:
         query_string = '&'.join([f'{k}={v}' for k, v in params.items()])
         return f"{base_url}?{query_string}"
 
-    def get_response(self, URL: str):
+    def reserve_request(self, URL: str):
+        """Reserve a paced send slot for URL; return seconds until it starts"""
+        cid = detail_cid(URL) if DETAIL_CACHE else None
+        if cid and DETAIL_CACHE.contains(cid):
+            return 0.0
+        return SCHEDULER.reserve(URL, proxyDict if proxy == 1 else None)
+
+    def reserve_geocode(self, fnl):
+        """Reserve a paced Geocoding API slot for this record; seconds until it starts, None if no request is due"""
+        address = fnl.get("Address")
+        if not address or address in GEOCODE_CACHE:
+            return None
+        return SCHEDULER.reserve(G_URL, proxyDict if proxy == 1 else None)
+
+    def cool_down(self, seconds):
+        """Hold back every Google request for a while without parking a worker"""
+        if HTTP_ARCHIVE and HTTP_ARCHIVE.replaying:
+            return
+        print(f"[PAUSE] Cooling down for {seconds:.1f}s")
+        SCHEDULER.pause(GOOGLE_BASE_URL, seconds)
+
+    def get_response(self, URL: str, reserved=False):
+        return bytes_selector(self.get_body(URL, reserved))
+
+    def get_body(self, URL: str, reserved=False):
+        """Raw response bytes for URL, from the detail cache or the network (b"" on failure)"""
+        cid = detail_cid(URL)
+        if cid and DETAIL_CACHE:
+            body = DETAIL_CACHE.get(cid)
+            if body is not None:
+                return body
+
+        markers = SCHEMA.stream_markers_for(self.extract_columns) if cid and STREAM_DETAILS and SCHEMA else []
+        # Streamed bodies only hold the fields their markers asked for, so those are part of the key
+        return FETCH_FLIGHTS.do((URL, tuple(markers)), self._fetch_body, URL, reserved, cid, markers)
+
+    def _fetch_body(self, URL, reserved, cid, markers):
+        # contains() rather than get(): the miss was already counted in get_body
+        if cid and DETAIL_CACHE and DETAIL_CACHE.contains(cid):
+            body = DETAIL_CACHE.get(cid)
+            if body is not None:
+                return body
+
         ua = random.choice(UA_POOL)
         local_headers = dict(headers)
         local_headers["User-Agent"] = ua
 
+        request_proxies = proxyDict if proxy == 1 else None
         attempts = 0
         while attempts < MAX_ATTEMPTS:
             attempts += 1
+            # Blocks here while the host or proxy circuit is open, pausing the crawl
+            breakers = BREAKERS.before_request(URL, request_proxies)
+            # Only blocks, 5xx and connection errors count against the breakers; a 404 (or a URL
+            # missing from a replay archive) is an answer from a healthy host
+            ok = False
             try:
-                if proxy == 1:
-                    r = requests.get(URL, headers=local_headers, proxies=proxyDict, timeout=30)
-                    # Track PacketStream usage (REAL COSTS)
-                    if hasattr(self, 'credit_tracker') and self.credit_tracker:
-                        response_size = len(r.content)
-                        self.credit_tracker.track_packetstream_request(response_size)
-                else:
-                    r = requests.get(URL, headers=local_headers, timeout=30)
+                # Paced before taking a concurrency slot, so time spent waiting never counts as in flight.
+                # The first attempt may already hold a slot from reserve_request()
+                if not (reserved and attempts == 1):
+                    SCHEDULER.wait(URL, request_proxies)
+                with CONCURRENCY:
+                    watch = MarkerWatch(markers, SCHEMA.stream_tail_bytes,
+                                        STREAM_MAX_KB * 1024) if markers else None
+                    if proxy == 1:
+                        r = SESSION_POOL.get(URL, headers=local_headers, proxies=proxyDict, watch=watch, timeout=30)
+                        # Track PacketStream usage (REAL COSTS)
+                        if hasattr(self, 'credit_tracker') and self.credit_tracker:
+                            self.credit_tracker.track_packetstream_request(r.wire_bytes, len(r.content))
+                    else:
+                        r = SESSION_POOL.get(URL, headers=local_headers, watch=watch, timeout=30)
 
                 status = r.status_code
-                txt = r.text[:600].lower()
+                head = r.content[:BLOCK_SCAN_BYTES].lower()
 
-                if status in (429, 503) or "unusual traffic" in txt or "sorry" in txt:
-                    wait = (BACKOFF_BASE ** attempts) + random.uniform(*JITTER_RANGE)
-                    print(f"[BACKOFF] {status}/block detected. Sleeping {wait:.1f}s (attempt {attempts})")
-                    time.sleep(wait)
+                if status in (429, 503) or any(marker in head for marker in BLOCK_MARKERS):
+                    # No per-worker sleep: the breaker pauses everyone once blocks pile up
+                    CONCURRENCY.on_block()
+                    print(f"[BLOCK] {status}/block detected (attempt {attempts})")
                     continue
 
                 if status != 200:
-                    wait = (BACKOFF_BASE ** attempts) + random.uniform(*JITTER_RANGE)
-                    print(f"[RETRY] HTTP {status}. Sleeping {wait:.1f}s (attempt {attempts})")
-                    time.sleep(wait)
+                    ok = status < 500
+                    print(f"[RETRY] HTTP {status} (attempt {attempts})")
                     continue
 
-                return Selector(text=r.content)
+                ok = True
+                CONCURRENCY.on_success()
+                if r.aborted:
+                    saved = ("rest of unknown size (chunked)" if r.bytes_saved is None
+                             else f"{r.bytes_saved / 1024:.0f} KB")
+                    print(f"[STREAM] {cid}: stopped at {watch.received / 1024:.0f} KB ({watch.reason}), "
+                          f"{saved} not downloaded")
+                # A body cut short only holds this projection's fields; a later full run must not get it
+                elif cid and DETAIL_CACHE:
+                    DETAIL_CACHE.put(cid, r.content)
+                return r.content
 
             except Exception as e:
-                wait = (BACKOFF_BASE ** attempts) + random.uniform(*JITTER_RANGE)
+                # requests' connection errors and timeouts are OSErrors; anything else is not the host's fault
+                ok = not isinstance(e, OSError)
+                wait = random.uniform(*JITTER_RANGE)
                 print(f"[ERROR] {e}. Sleeping {wait:.1f}s (attempt {attempts})")
                 time.sleep(wait)
+            finally:
+                BREAKERS.record(breakers, ok)
 
-        if proxy == 1:
-            try:
-                r = requests.get(URL, headers=local_headers, timeout=30)
-                return Selector(text=r.content)
-            except Exception as e:
-                print(f"[FATAL] Could not fetch after retries: {e}")
-        else:
-            print("[FATAL] Could not fetch after retries.")
-        return Selector(text="")
+        # Never retry without the proxy: that would expose the real IP to a host that is already blocking
+        print("[FATAL] Could not fetch after retries.")
+        return b""
 
-    def get_listings(self, search_term, response: Selector):
+    def next_page_url(self, body: bytes):
+        """Absolute URL of the next results page, or None on the last page"""
+        nxt_page = scan_next_page(body)
+        return GOOGLE_BASE_URL + nxt_page if nxt_page else None
+
+    def get_listings(self, search_term, body: bytes):
+        """Detail URLs for the cards on a results page that no county has claimed yet"""
         cmp = []
-        # for listing_selector in response.css('div div[jsname="GZq3Ke"]div div[jsname="jXK9ad"]'):
-        for listing_selector in response.css('div div[jsname="jXK9ad"]'):
-            listing_id = listing_selector.css('a::attr(data-cid)').get()
-            if listing_id not in self.check_dup:
-                self.check_dup.append(listing_id)
+        self.listing_cards = 0
+        if self.crawl_mode != "detail":
+            root = parse_tree(body)
+            cards = SCHEMA.extract_cards(root, self.extract_columns) if root is not None else []
+            for listing_id, record in cards:
+                self.listing_cards += 1
+                if self.seen.claim(listing_id):
+                    details_url = details_url_t.format(q=quote_plus(search_term), id=listing_id)
+                    self.card_records[details_url] = record
+                    cmp.append(details_url)
+            return cmp
+        # CIDs straight from the bytes; the DOM is only built when the scan disagrees with the card count
+        cids = scan_cids(body)
+        if cids is None:
+            cids = dom_cids(body)
+            print(f"[LISTING] Byte scan disagreed with the card markup - parsed {len(cids)} cards from the DOM")
+        for listing_id in cids:
+            self.listing_cards += 1
+            if self.seen.claim(listing_id):
                 details_url = details_url_t.format(q=quote_plus(search_term), id=listing_id)
                 cmp.append(details_url)
         return cmp
 
-    def get_data(self, url: str):
-        time.sleep(random.uniform(*DETAIL_DELAY_RANGE))
-        response = self.get_response(url)
-        name = response.css('h2[data-attrid="title"] span::text').get()
-        address = response.css('.w8qArf:contains(Address) + .LrzXr::text').get()
-        if not address:
-            address = response.xpath("//span[contains(*, 'Address')]/following::span[1]/text()").get()
-        phone = response.css('span:contains("Phone") + span a span::text').get()
-        hours = ', '.join(
-            [f"{row.css('td::text').get()}: {row.css('td+td::text').get('').replace('–', '-')}" for row in
-             response.css('table.WgFkxc tr')])
-        website = response.css('a:contains("Website")::attr(href)').re_first(r'q=(.*)/') or response.css(
-            'a:contains("Website")::attr(href)').get()
-        rating = response.css('.Aq14fc::text').get('0') + '/5'
-        reviews = response.css('.hqzQac [data-sort_by="qualityScore"] span::text').get('')
-        cate = " ".join(response.xpath("//span[contains(@class, 'YhemCb')]//text()").getall()).split(" in ")[0].strip()
-        
-        fnl = {
-            "Name": name,
-            "Category": cate,
-            "Phone Number": phone,
-            "Hours": hours,
-            "Website": website,
-            "Rating": rating,
-            "Address": address,
-            "City": "",
-            "State": "",
-            "Zip Code": ""
-        }
-        
+    def duplicate_cards_note(self, links):
+        skipped = self.listing_cards - len(links)
+        return f" ({skipped} already seen)" if skipped > 0 else ""
+
+    def get_data(self, url: str, reserved=False):
+        card, fetch = self.take_card(url)
+        fnl = card
+        if fetch:
+            fnl = self.merge_card(card, self.parse_details(self.get_body(url, reserved)))
+        self.geocode_record(fnl)
+        self.save_record(fnl, url)
+
+    def take_card(self, url):
+        """(listing-card record or None, whether the detail page still has to be fetched)"""
+        card = self.card_records.pop(url, None)
+        if card is None:
+            return None, True
+        fetch = self.crawl_mode == "hybrid" and bool(self.missing_from_card(card))
+        with self._stats_lock:
+            self.card_stats["cards"] += 1
+            self.card_stats["details"] += fetch
+        return card, fetch
+
+    def needs_detail(self, url):
+        """Whether get_data(url) will fetch the detail page (take_card without taking the card)"""
+        card = self.card_records.get(url)
+        return card is None or (self.crawl_mode == "hybrid" and bool(self.missing_from_card(card)))
+
+    def missing_from_card(self, card):
+        return [column for column in self.card_columns if not card.get(column)]
+
+    def merge_card(self, card, detail):
+        """Detail record with the fields the card already had kept from the card"""
+        if card is None:
+            return detail
+        fnl = dict(card)
+        for column in self.missing_from_card(card):
+            if column in detail:
+                fnl[column] = detail[column]
+        return fnl
+
+    def warn_card_gaps(self):
+        """Hybrid mode saves nothing when a wanted column is one listing cards never carry"""
+        never = tuple(c for c in self.card_columns if c not in SCHEMA.cards.columns)
+        if never and never not in CARD_GAP_WARNINGS:
+            CARD_GAP_WARNINGS.add(never)
+            print(f"[CARDS] hybrid: cards never carry {', '.join(never)}, so every business still needs its "
+                  f"detail page - leave these out of [OUTPUT] fields or use crawl_mode = detail")
+
+    def print_card_stats(self):
+        cards, details = self.card_stats["cards"], self.card_stats["details"]
+        if cards:
+            print(f"[CARDS] {self.crawl_mode}: {cards} businesses from listing cards, "
+                  f"{details} needed a detail page ({1 - details / cards:.0%} of detail requests avoided)")
+
+    def parse_details(self, body: bytes):
+        """Extract one business record from detail page bytes"""
+        if PARSE_POOL:
+            return PARSE_POOL.parse(body, self.extract_columns)
+        if PARSER == "lxml" and SCHEMA:
+            return extract_details(body, SCHEMA, self.extract_columns)
+        return selector_details(body)
+
+    def geocode_offline(self, fnl):
+        """Fill City/State/Zip and the street address by parsing the address; False if it's ambiguous"""
+        if not OFFLINE_GEOCODE:
+            return False
+        parsed = parse_address(fnl.get("Address"))
+        if not parsed or not all(parsed[c] for c in self.geocode_columns):
+            return False
+        for column in self.geocode_columns:
+            fnl[column] = parsed[column]
+        if self.geocode_street:
+            fnl["Address"] = f"{parsed['street_number']} {parsed['route']}"
+        with self._stats_lock:
+            self.geocode_stats["offline"] += 1
+        return True
+
+    def print_geocode_stats(self):
+        offline, api = self.geocode_stats["offline"], self.geocode_stats["api"]
+        if offline + api:
+            print(f"[ADDRESS] {offline} addresses parsed offline, {api} sent to the Geocoding API "
+                  f"({api / (offline + api):.0%} fallback rate)")
+
+    def geocode_record(self, fnl, offline=True, reserved=False):
+        """Fill City/State/Zip and the street address, offline when the address parses, else from the API"""
+        if not self.geocode:
+            return
+        if offline and fnl.get("Address") and self.geocode_offline(fnl):
+            return
+        address = fnl["Address"]
         st_ad, route = "", ""
         if address:
+            with self._stats_lock:
+                self.geocode_stats["api"] += 1
             # Track Google Maps API usage (FREE, just quota)
             if hasattr(self, 'credit_tracker') and self.credit_tracker:
                 self.credit_tracker.track_google_api_request()
             
-            comps = geocode_with_cache(address)
+            comps = geocode_with_cache(address, self.credit_tracker, reserved)
             for item in comps:
                 nm = item.get("types", [""])[0]
                 value = item.get("long_name")
@@ -332,5 +644,11 @@ class Scraper:
                 if not nm: continue
                 fnl[nm] = value
         fnl["Address"] = f"{st_ad} {route}"
+
+    def save_record(self, fnl, url=None):
+        name = fnl.get("Name")
+        fnl = {column: fnl.get(column, "") for column in self.output_columns}
         self.cmp.append(fnl)
+        if url and name:
+            self.seen.mark_saved(detail_cid(url))
         print(f"Scraping ------------> {name}")
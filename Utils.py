@@ -1,15 +1,18 @@
 from difflib import SequenceMatcher
 import pandas as pd
 import configparser
+from requests.utils import DEFAULT_ACCEPT_ENCODING
 import os
 
 
+GOOGLE_BASE_URL = 'https://www.google.com'
+
 # Update this to use your main.py coordinates
 listings_url_t = 'https://www.google.com/search?sxsrf=ACYBGNS1OuAlrwXrWvHCe01W6jx80oL9jA:1581870852554&' \
                      'q={q}&npsic=0&rflfq=1&rlha=0&rllag=40.4173,-82.9071,2415&tbm=lcl&' \
                      'ved=2ahUKEwiN1fyRwNbnAhUHVBUIHdOxBdIQjGp6BAgLEFk'
 
-details_url_t = 'https://www.google.com/async/lcl_akp?ei=N5dMXuOUC82ckgXKz634Ag&' \
+details_url_t = GOOGLE_BASE_URL + '/async/lcl_akp?ei=N5dMXuOUC82ckgXKz634Ag&' \
                 'tbs=lrf:!1m4!1u3!2m2!3m1!1e1!1m4!1u2!2m2!2m1!1e1!1m4!1u16!2m2!16m1!1e1!1m4!1u16!2m2!16m1!1e2' \
                 '!2m1!1e2!2m1!1e16!2m1!1e3!3sIAE,lf:1,lf_ui:9&yv=3&lqi=Chd2ZWdhbiByZXN0YXVyYW50IHN5ZG5le' \
                 'UjDmMXr9pWAgAhaNQoQdmVnYW4gcmVzdGF1cmFudBAAEAEYABgBGAIiF3ZlZ2FuIHJlc3RhdXJhbnQgc3lkbmV5&' \
@@ -25,7 +28,9 @@ address_columns = {
 }
 
 headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.5005.63 Safari/537.36"
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.5005.63 Safari/537.36",
+    # Only advertise encodings this install can decode (br needs the brotli package)
+    "Accept-Encoding": DEFAULT_ACCEPT_ENCODING
 }
 
 config = configparser.ConfigParser()
@@ -33,6 +38,20 @@ config = configparser.ConfigParser()
 script_dir = os.path.dirname(os.path.abspath(__file__))
 settings_path = os.path.join(script_dir, "settings.ini")
 
+# Crawl controls (with defaults)
+def _getf(section, key, default):
+    try: return float(config.get(section, key))
+    except: return float(default)
+def _geti(section, key, default):
+    try: return int(config.get(section, key))
+    except: return int(default)
+def _getb(section, key, default):
+    try: return 1 if int(config.get(section, key)) else 0
+    except: return int(default)
+def _gets(section, key, default):
+    try: return config.get(section, key).strip() or default
+    except: return default
+
 if os.path.exists(settings_path):
     config.read(settings_path)
     proxy = int(config.get("PROXIES", "useproxy"))
@@ -53,21 +72,8 @@ if os.path.exists(settings_path):
         "https": https_proxy,
     }
 
-    # Crawl controls (with defaults)
-    def _getf(section, key, default):
-        try: return float(config.get(section, key))
-        except: return float(default)
-    def _geti(section, key, default):
-        try: return int(config.get(section, key))
-        except: return int(default)
-    def _getb(section, key, default):
-        try: return 1 if int(config.get(section, key)) else 0
-        except: return int(default)
-
     if 'CRAWL' in config:
         MAX_WORKERS = _geti("CRAWL", "max_workers", 5)
-        PAGE_DELAY_RANGE = (_getf("CRAWL", "page_delay_min", 2.5), _getf("CRAWL", "page_delay_max", 5.0))
-        DETAIL_DELAY_RANGE = (_getf("CRAWL", "detail_delay_min", 0.4), _getf("CRAWL", "detail_delay_max", 1.0))
         LONG_PAUSE_EVERY_PAGES = _geti("CRAWL", "long_pause_every_pages", 10)
         LONG_PAUSE_RANGE = (_getf("CRAWL", "long_pause_min", 15), _getf("CRAWL", "long_pause_max", 35))
         MAX_ATTEMPTS = _geti("CRAWL", "max_attempts", 3)
@@ -79,8 +85,6 @@ if os.path.exists(settings_path):
         RESUME = _getb("CRAWL", "resume", 1)
     else:
         MAX_WORKERS = 5
-        PAGE_DELAY_RANGE = (2.5, 5.0)
-        DETAIL_DELAY_RANGE = (0.4, 1.0)
         LONG_PAUSE_EVERY_PAGES = 10
         LONG_PAUSE_RANGE = (15, 35)
         MAX_ATTEMPTS = 3
@@ -97,8 +101,6 @@ else:
     print("⚠️  Warning: settings.ini not found, running without proxy")
     # Defaults for crawl controls
     MAX_WORKERS = 5
-    PAGE_DELAY_RANGE = (2.5, 5.0)
-    DETAIL_DELAY_RANGE = (0.4, 1.0)
     LONG_PAUSE_EVERY_PAGES = 10
     LONG_PAUSE_RANGE = (15, 35)
     MAX_ATTEMPTS = 3
@@ -108,3 +110,90 @@ else:
     AUTOSAVE_EVERY_COUNTIES = 1
     SHUFFLE_COUNTIES = 1
     RESUME = 1
+
+# HTTP connection pooling (keep-alive sessions per host and proxy)
+POOL_CONNECTIONS = _geti("CRAWL", "pool_connections", 10)
+POOL_MAXSIZE = _geti("CRAWL", "pool_maxsize", 20)
+
+# Crawl engine: "threads" (per-page ThreadPoolExecutor) or "async" (one event loop)
+ENGINE = _gets("CRAWL", "engine", "threads").lower()
+ASYNC_CONCURRENCY = _geti("CRAWL", "async_concurrency", 20)
+
+# Adaptive (AIMD) concurrency: start at max_workers, move between the bounds
+ADAPTIVE_CONCURRENCY = _getb("CRAWL", "adaptive_concurrency", 1)
+AIMD_MIN_WORKERS = _geti("CRAWL", "aimd_min_workers", 1)
+AIMD_MAX_WORKERS = _geti("CRAWL", "aimd_max_workers", 20)
+AIMD_INCREASE = _getf("CRAWL", "aimd_increase", 1)
+AIMD_DECREASE = _getf("CRAWL", "aimd_decrease", 0.5)
+AIMD_COOLDOWN = _getf("CRAWL", "aimd_cooldown", 5)
+
+# Request pacing: token buckets per target host and per proxy (requests/second, 0 = unlimited)
+HOST_RATE = _getf("CRAWL", "host_rate", 3)
+HOST_BURST = _getf("CRAWL", "host_burst", 3)
+PROXY_RATE = _getf("CRAWL", "proxy_rate", 6)
+PROXY_BURST = _getf("CRAWL", "proxy_burst", 6)
+
+# On-disk detail page cache keyed by business CID
+DETAIL_CACHE_ENABLED = _getb("CACHE", "detail_cache", 1)
+DETAIL_CACHE_PATH = _gets("CACHE", "path", os.path.join("cache", "details"))
+DETAIL_CACHE_TTL_HOURS = _getf("CACHE", "ttl_hours", 168)
+DETAIL_CACHE_MAX_MB = _getf("CACHE", "max_mb", 500)
+
+# Record every HTTP response to an archive, or replay one with no network
+REPLAY_MODE = _gets("REPLAY", "mode", "off").lower()
+REPLAY_ARCHIVE = _gets("REPLAY", "archive", os.path.join("recordings", "session.jsonl.gz"))
+
+# Circuit breakers per target host and per proxy session: open after N consecutive
+# failures (blocks, 429/5xx, connection errors), pause the crawl, then probe before resuming
+BREAKER_FAILURES = _geti("CRAWL", "breaker_failures", 5)
+BREAKER_RECOVERY = _getf("CRAWL", "breaker_recovery", 60)
+BREAKER_HALF_OPEN_PROBES = _geti("CRAWL", "breaker_half_open_probes", 1)
+BREAKER_CLOSE_AFTER = _geti("CRAWL", "breaker_close_after", 2)
+
+# Result pages fetched ahead of the detail fetches (pnnext pipelining)
+PREFETCH_PAGES = _geti("CRAWL", "prefetch_pages", 1)
+
+# Detail page extraction: "lxml" (precompiled XPaths over raw bytes) or "selector" (Scrapy CSS)
+PARSER = _gets("CRAWL", "parser", "lxml").lower()
+
+# Worker processes for detail page parsing (0 = parse on the fetch threads)
+PARSE_PROCESSES = _geti("CRAWL", "parse_processes", 0)
+
+# Run-wide seen-CID index. Opt-in with resume on: CIDs of autosaved records persist per query and
+# state until every county of the job completes, so an interrupted job skips them when resumed.
+# reset_seen_cids forgets them at the start of the next run.
+PERSIST_SEEN_CIDS = _getb("CRAWL", "persist_seen_cids", 0)
+RESET_SEEN_CIDS = _getb("CRAWL", "reset_seen_cids", 0)
+SEEN_CIDS_PATH = _gets("CRAWL", "seen_cids_path", "seen_cids.sqlite")
+
+# Field selectors for the lxml parser; relative paths are next to this script
+EXTRACTION_SCHEMA = os.path.join(script_dir, _gets("CRAWL", "extraction_schema", "extraction_schema.json"))
+
+# Stream detail pages and stop once the schema's field markers have arrived (or at the cap, 0 = none)
+STREAM_DETAILS = _getb("CRAWL", "stream_details", 0)
+STREAM_MAX_KB = _geti("CRAWL", "stream_max_kb", 256)
+
+# Output column projection, e.g. "Name, Phone Number" (empty = every column).
+# Leaving out City, State and Zip Code skips geocoding entirely.
+OUTPUT_FIELDS = _gets("OUTPUT", "fields", "")
+
+# detail: one detail request per business; cards: listing-card fields only, no detail requests;
+# hybrid: detail requests only for businesses whose card lacks a wanted field. Cards never carry Hours or
+# Website, so hybrid only saves requests when [OUTPUT] fields leaves those out
+CRAWL_MODE = _gets("CRAWL", "crawl_mode", "detail").lower()
+if CRAWL_MODE not in ("detail", "cards", "hybrid"):
+    print(f"[CARDS] Unknown crawl_mode '{CRAWL_MODE}' (detail, cards or hybrid) - using detail")
+    CRAWL_MODE = "detail"
+
+# Geocode cache (SQLite, WAL): new addresses are committed in batches of N or every S seconds
+GEOCODE_CACHE_PATH = _gets("CACHE", "geocode_path", "geocode_cache.sqlite")
+GEOCODE_FLUSH_EVERY = _geti("CACHE", "geocode_flush_every", 50)
+GEOCODE_FLUSH_SECONDS = _getf("CACHE", "geocode_flush_seconds", 5)
+
+# Fill City/State/Zip from the scraped address when it parses unambiguously; the Geocoding API is the fallback
+OFFLINE_GEOCODE = _getb("CRAWL", "offline_geocode", 1)
+
+# Geocoding API pacing: one token bucket for the whole process (requests/second, burst).
+# Without geocode_rate, the older geocode_min_interval setting gives the rate.
+GEOCODE_RATE = _getf("CRAWL", "geocode_rate", 1 / GEOCODE_MIN_INTERVAL if GEOCODE_MIN_INTERVAL > 0 else 0)
+GEOCODE_BURST = _getf("CRAWL", "geocode_burst", 5)
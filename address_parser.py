@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Offline Address Parser
+Splits a scraped US address into street number, route, city, state and ZIP without calling the Geocoding API
+"""
+
+import functools
+import re
+
+STATE_NAMES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "PR": "Puerto Rico", "RI": "Rhode Island", "SC": "South Carolina",
+    "SD": "South Dakota", "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont",
+    "VA": "Virginia", "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+}
+STATE_ABBREVIATIONS = {name.lower(): abbr for abbr, name in STATE_NAMES.items()}
+
+# First three ZIP digits -> state (USPS sectional centers). Prefixes not listed
+# (military APO/FPO, territories other than PR) are left to the Geocoding API.
+ZIP3_RANGES = [
+    (5, 5, "NY"), (6, 7, "PR"), (9, 9, "PR"), (10, 27, "MA"), (28, 29, "RI"), (30, 38, "NH"),
+    (39, 49, "ME"), (50, 54, "VT"), (55, 55, "MA"), (56, 59, "VT"), (60, 69, "CT"), (70, 89, "NJ"),
+    (100, 149, "NY"), (150, 196, "PA"), (197, 199, "DE"), (200, 200, "DC"), (201, 201, "VA"),
+    (202, 205, "DC"), (206, 219, "MD"), (220, 246, "VA"), (247, 268, "WV"), (270, 289, "NC"),
+    (290, 299, "SC"), (300, 319, "GA"), (320, 339, "FL"), (341, 349, "FL"), (350, 369, "AL"),
+    (370, 385, "TN"), (386, 397, "MS"), (398, 399, "GA"), (400, 427, "KY"), (430, 459, "OH"),
+    (460, 479, "IN"), (480, 499, "MI"), (500, 528, "IA"), (530, 549, "WI"), (550, 567, "MN"),
+    (569, 569, "DC"), (570, 577, "SD"), (580, 588, "ND"), (590, 599, "MT"), (600, 629, "IL"),
+    (630, 658, "MO"), (660, 679, "KS"), (680, 693, "NE"), (700, 714, "LA"), (716, 729, "AR"),
+    (730, 732, "OK"), (733, 733, "TX"), (734, 749, "OK"), (750, 799, "TX"), (800, 816, "CO"),
+    (820, 831, "WY"), (832, 838, "ID"), (840, 847, "UT"), (850, 865, "AZ"), (870, 884, "NM"),
+    (885, 885, "TX"), (889, 898, "NV"), (900, 961, "CA"), (967, 968, "HI"), (970, 979, "OR"),
+    (980, 994, "WA"), (995, 999, "AK"),
+]
+ZIP3_STATES = {zip3: state for low, high, state in ZIP3_RANGES for zip3 in range(low, high + 1)}
+
+# USPS Publication 28 abbreviations as the Geocoding API spells them out in route long_name
+STREET_SUFFIXES = {
+    "aly": "Alley", "anx": "Annex", "ave": "Avenue", "av": "Avenue", "byp": "Bypass", "blvd": "Boulevard",
+    "br": "Branch", "brg": "Bridge", "cswy": "Causeway", "ctr": "Center", "cir": "Circle", "ct": "Court",
+    "cv": "Cove", "crk": "Creek", "xing": "Crossing", "dr": "Drive", "expy": "Expressway", "ext": "Extension",
+    "fwy": "Freeway", "gdns": "Gardens", "gtwy": "Gateway", "hts": "Heights", "hwy": "Highway", "holw": "Hollow",
+    "jct": "Junction", "ln": "Lane", "lndg": "Landing", "loop": "Loop", "mall": "Mall", "mdws": "Meadows",
+    "mtn": "Mountain", "pkwy": "Parkway", "pike": "Pike", "pl": "Place", "plz": "Plaza", "pt": "Point",
+    "rd": "Road", "rte": "Route", "rdg": "Ridge", "row": "Row", "run": "Run", "sq": "Square", "st": "Street",
+    "ter": "Terrace", "trce": "Trace", "trl": "Trail", "tpke": "Turnpike", "vw": "View", "vly": "Valley",
+    "walk": "Walk", "way": "Way",
+}
+DIRECTIONALS = {
+    "n": "North", "s": "South", "e": "East", "w": "West",
+    "ne": "Northeast", "nw": "Northwest", "se": "Southeast", "sw": "Southwest",
+}
+
+STREET_LINE = re.compile(r"^(\d+[A-Za-z]?(?:-\d+)?)\s+(.+)$")
+# Unit designators need a number or a single letter after them, so "123 Floor St" stays a street
+UNIT_VALUE = r"(?:\d[\w-]*|[A-Za-z])"
+UNIT = re.compile(rf"(?:\s+(?:ste|suite|unit|apt|bldg|fl|floor|rm|room)\.?\s*{UNIT_VALUE}|\s*#\s*[\w-]+)$",
+                  re.IGNORECASE)
+UNIT_PART = re.compile(rf"^(?:(?:ste|suite|unit|apt|bldg|fl|floor|rm|room)\.?\s*{UNIT_VALUE}|#\s*[\w-]+)$",
+                       re.IGNORECASE)
+STATE_ZIP = re.compile(r"^([A-Za-z][A-Za-z .]*?)\.?(?:\s+(\d{5})(?:-\d{4})?)?$")
+COUNTRY = ("usa", "us", "united states", "united states of america")
+
+
+def expand_route(route):
+    """Spell out directionals and the street suffix: "N Main St" -> "North Main Street".
+
+    A leading letter is only a direction when a street name follows it: in
+    "E St SW" the E is the name, so that becomes "E Street Southwest".
+    """
+    words = route.replace(".", "").split()
+    if len(words) < 2:
+        return " ".join(words)
+    suffix = len(words) - 1
+    if words[-1].lower() in DIRECTIONALS and len(words) > 2:
+        words[-1] = DIRECTIONALS[words[-1].lower()]
+        suffix -= 1
+    name_end = suffix + 1
+    if suffix > 0 and words[suffix].lower() in STREET_SUFFIXES:
+        words[suffix] = STREET_SUFFIXES[words[suffix].lower()]
+        name_end = suffix
+    if words[0].lower() in DIRECTIONALS and name_end > 1:
+        words[0] = DIRECTIONALS[words[0].lower()]
+    return " ".join(words)
+
+
+def parse_address(address):
+    """Street number, route, City, State (full name) and Zip Code of a one-line US address.
+
+    Returns None when the address can't be read unambiguously (no house
+    number, unknown state, extra parts, or a ZIP that belongs to another
+    state). Zip Code is "" when the address has none.
+    """
+    parts = [part.strip() for part in (address or "").split(",") if part.strip()]
+    if parts and parts[-1].lower() in COUNTRY:
+        parts.pop()
+    if len(parts) < 3:
+        return None
+    street, city, state_zip = parts[0], parts[-2], parts[-1]
+    if not all(UNIT_PART.match(part) for part in parts[1:-2]):
+        return None
+
+    match = STATE_ZIP.match(state_zip)
+    if not match:
+        return None
+    state, zip_code = match.group(1).strip(), match.group(2) or ""
+    state = state.upper() if state.upper() in STATE_NAMES else STATE_ABBREVIATIONS.get(state.lower())
+    if not state:
+        return None
+    if zip_code and ZIP3_STATES.get(int(zip_code[:3])) != state:
+        return None
+
+    match = STREET_LINE.match(UNIT.sub("", street))
+    if not match or not any(c.isalpha() for c in city):
+        return None
+    return {
+        "street_number": match.group(1),
+        "route": expand_route(match.group(2)),
+        "City": city,
+        "State": STATE_NAMES[state],
+        "Zip Code": zip_code,
+    }
+
+
+# Every spelling of a suffix or directional -> one form, for cache keys
+_STANDARD_SUFFIXES = {}
+for _abbr, _name in STREET_SUFFIXES.items():
+    _STANDARD_SUFFIXES.setdefault(_name.lower(), _abbr)
+KEY_WORDS = {abbr: _STANDARD_SUFFIXES[name.lower()] for abbr, name in STREET_SUFFIXES.items()}
+KEY_WORDS.update(_STANDARD_SUFFIXES)
+KEY_WORDS.update({name.lower(): abbr for abbr, name in DIRECTIONALS.items()})
+KEY_PUNCTUATION = re.compile(r"[^\w#-]+")
+
+
+@functools.lru_cache(maxsize=65536)
+def address_key(address):
+    """Canonical form of an address for cache lookups and request coalescing.
+
+    Case, punctuation, street suffix and directional spelling, units, state
+    names, ZIP+4 and a trailing country don't change the geocode, so they
+    don't change the key: "1600 North Main Street, Suite 4, Columbus, Ohio
+    43215-1234, USA" -> "1600 n main st, columbus, oh 43215".
+    """
+    parts = [" ".join(KEY_PUNCTUATION.sub(" ", part).lower().split()) for part in (address or "").split(",")]
+    parts = [part for part in parts if part]
+    if parts and parts[-1] in COUNTRY:
+        parts.pop()
+    if not parts:
+        return ""
+    street = " ".join(KEY_WORDS.get(word, word) for word in UNIT.sub("", parts[0]).split())
+    parts = [street] + [part for part in parts[1:] if not UNIT_PART.match(part)]
+    match = STATE_ZIP.match(parts[-1]) if len(parts) > 1 else None
+    if match:
+        state = match.group(1).strip()
+        state = STATE_ABBREVIATIONS.get(state, state).lower()
+        parts[-1] = f"{state} {match.group(2)}" if match.group(2) else state
+    return ", ".join(parts)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Asyncio Crawl Engine
+Runs listing pages, detail fetches and geocodes as coroutines on one event loop
+"""
+
+import asyncio
+import concurrent.futures
+import datetime
+import random
+
+from Utils import LONG_PAUSE_EVERY_PAGES, LONG_PAUSE_RANGE, PREFETCH_PAGES
+
+
+class AsyncCrawler:
+    """Alternative to Scraper.crawl_threaded() with the same inputs and outputs.
+
+    Every network call goes through one global semaphore, so at most
+    ``concurrency`` requests are in flight across listing pages, details and
+    geocodes together. The next results page is fetched as soon as the current
+    one is parsed instead of waiting for its slowest detail fetch, but at most
+    ``lookahead`` pages may still have details outstanding while it is.
+
+    The fetch layer (pooled requests sessions, retries, credit tracking) is
+    blocking, so each request runs on a worker thread of a pool sized to the
+    concurrency limit. Pacing slots are reserved from the request scheduler and
+    awaited on the loop, so a worker thread is only taken once a request may
+    actually be sent.
+    """
+
+    def __init__(self, scraper, concurrency=20, lookahead=PREFETCH_PAGES):
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self.lookahead = max(1, lookahead)
+        self.errors = 0
+
+    async def _blocking(self, fn, *args):
+        async with self._semaphore:
+            return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    async def _fetch(self, url):
+        await asyncio.sleep(self.scraper.reserve_request(url))
+        return await self._blocking(self.scraper.get_body, url, True)
+
+    async def _parse(self, fn, *args):
+        return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    async def _detail(self, url):
+        card, fetch = self.scraper.take_card(url)
+        fnl = card
+        if fetch:
+            body = await self._fetch(url)
+            fnl = self.scraper.merge_card(card, await self._parse(self.scraper.parse_details, body))
+        if not (self.scraper.geocode and fnl.get("Address")):
+            self.scraper.geocode_record(fnl)
+        elif not self.scraper.geocode_offline(fnl):
+            # Paced on the loop like _fetch, so a geocode waiting for its slot holds no semaphore slot
+            delay = self.scraper.reserve_geocode(fnl)
+            await asyncio.sleep(delay or 0)
+            await self._blocking(self.scraper.geocode_record, fnl, False, delay is not None)
+        self.scraper.save_record(fnl, url)
+
+    async def _guarded(self, coro):
+        try:
+            await coro
+        except Exception as e:
+            self.errors += 1
+            print(f"[ERROR] Detail fetch failed: {e}")
+
+    async def crawl(self):
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        scraper = self.scraper
+        pending_pages = []
+
+        body = await self._fetch(scraper.get_location_based_search_url())
+        pg = 1
+        while True:
+            print(f"\n[PAGE] Scraping Page # {pg} at {datetime.datetime.now().strftime('%H:%M:%S')}")
+            try:
+                links = scraper.get_listings(scraper.search_terms, body)
+                print(f"[SUCCESS] Found {len(links)} business links on page {pg}"
+                      f"{scraper.duplicate_cards_note(links)}")
+                if not scraper.listing_cards:
+                    print("[WARNING] No links found - page might be empty or blocked")
+                    break
+
+                pending_pages.append(asyncio.gather(*(self._guarded(self._detail(url)) for url in links)))
+
+                nxt_page = scraper.next_page_url(body)
+                if not nxt_page:
+                    print("[COMPLETE] No more pages found - search complete")
+                    break
+
+                pg += 1
+                if pg % LONG_PAUSE_EVERY_PAGES == 0:
+                    scraper.cool_down(random.uniform(*LONG_PAUSE_RANGE))
+                # Bounded lookahead: don't run further ahead than the detail work can absorb
+                while len(pending_pages) >= self.lookahead + 1:
+                    await pending_pages.pop(0)
+                print("[NEXT] Moving to next page...")
+                body = await self._fetch(nxt_page)
+            except Exception as e:
+                print(f"[ERROR] Error on page {pg}: {e}")
+                print(f"[TIME] Error time: {datetime.datetime.now().strftime('%H:%M:%S')}")
+                break
+
+        if pending_pages:
+            await asyncio.gather(*pending_pages)
+        print(f"[SUCCESS] Data collected - Total businesses so far: {len(scraper.cmp)}")
+
+    def run(self):
+        """Crawl every results page and return the scraper's records"""
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            asyncio.run(self.crawl())
+        finally:
+            self._executor.shutdown(wait=True)
+        if self.errors:
+            print(f"[WARNING] {self.errors} detail fetches failed")
+        return self.scraper.get_data_only()
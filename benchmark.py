@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Crawl Throughput Benchmark
+Drives Scraper.start_and_return_data and main's county loop against the local mock endpoint
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from mock_google import MockGoogle
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Bench:
+    """Points the scraper modules at a MockGoogle server and times runs against it"""
+
+    def __init__(self, mock, args):
+        self.mock = mock
+        self.args = args
+        self.latencies = []
+
+        # Imported here so the scraper's relative cache/stats files land in the temp dir
+        import Google
+        import async_engine
+        import main as main_module
+        from concurrency import AIMDController
+        from scheduler import RequestScheduler
+        self.google = Google
+        self.main = main_module
+
+        base = mock.base_url
+        Google.proxy = 0
+        Google.GOOGLE_BASE_URL = base
+        Google.details_url_t = Google.details_url_t.replace("https://www.google.com", base)
+        Google.G_URL = Google.G_URL.replace("https://maps.googleapis.com", base)
+        Google.DETAIL_CACHE = None
+        Google.SCHEDULER = RequestScheduler(args.host_rate, args.host_rate or 1, 0, 0)
+        Google.CONCURRENCY = AIMDController(args.workers, 1 if args.adaptive else args.workers,
+                                            args.max_workers if args.adaptive else args.workers)
+        Google.LONG_PAUSE_EVERY_PAGES = async_engine.LONG_PAUSE_EVERY_PAGES = 10 ** 9
+        Google.STREAM_DETAILS = 1 if args.stream else 0
+        Google.OFFLINE_GEOCODE = 1 if args.offline_geocode else 0
+        if args.crawl_mode:
+            Google.CRAWL_MODE = args.crawl_mode
+        main_module.RESUME = 0
+        main_module.SHUFFLE_COUNTIES = 0
+        main_module.AUTOSAVE_EVERY_COUNTIES = 0
+
+        pool = Google.SESSION_POOL
+        original_get = pool.get
+
+        def timed_get(url, *a, **kw):
+            started = time.perf_counter()
+            try:
+                return original_get(url, *a, **kw)
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+
+        pool.get = timed_get
+
+    def _reset(self, engine):
+        self.google.ENGINE = engine
+        self.google.GEOCODE_CACHE.clear()
+        self.latencies.clear()
+        self.wire_start = self.google.SESSION_POOL.wire_bytes
+        for key in self.mock.stats:
+            self.mock.stats[key] = 0
+
+    def run_scraper(self):
+        businesses = 0
+        for index in range(self.args.searches):
+            lat, lon = 40.0 + index, -82.0 - index
+            scraper = self.google.Scraper(f"{self.args.query} in Search {index}, OH", "", lat, lon,
+                                          fields=self.args.fields)
+            businesses += len(scraper.start_and_return_data())
+        return businesses
+
+    def run_counties(self):
+        from counties_data import counties_data
+        from credit_tracker import CorrectedCreditTracker
+        counties = [dict(c) for c in counties_data[self.args.state][:self.args.counties]]
+        tracker = CorrectedCreditTracker()
+        data = self.main.scrape_counties(self.args.query, self.args.state, counties, tracker,
+                                         "benchmark", os.path.join("Output", "benchmark.xlsx"), self.args.fields)
+        return len(data)
+
+    def measure(self, scenario, engine):
+        self._reset(engine)
+        run = self.run_scraper if scenario == "scraper" else self.run_counties
+        if self.args.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(sys.stdout if self.args.verbose else output):
+            businesses = run()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if self.args.trace_memory else 0
+        if self.args.trace_memory:
+            tracemalloc.stop()
+
+        requests_made = len(self.latencies)
+        return {
+            "scenario": scenario,
+            "engine": engine,
+            "businesses": businesses,
+            "requests": requests_made,
+            "seconds": round(elapsed, 3),
+            "requests_per_sec": round(requests_made / elapsed, 2) if elapsed else 0,
+            "businesses_per_min": round(businesses / elapsed * 60, 1) if elapsed else 0,
+            "latency_p50_ms": round(percentile(self.latencies, 0.50) * 1000, 1),
+            "latency_p95_ms": round(percentile(self.latencies, 0.95) * 1000, 1),
+            "peak_memory_mb": round(peak / (1024 * 1024), 2),
+            "wire_mb": round((self.google.SESSION_POOL.wire_bytes - self.wire_start) / (1024 * 1024), 2),
+            "server": dict(self.mock.stats),
+        }
+
+
+def print_result(result):
+    print(f"[BENCH] {result['scenario']}/{result['engine']}: {result['businesses']} businesses, "
+          f"{result['requests']} requests in {result['seconds']:.2f}s")
+    memory = f" | peak memory {result['peak_memory_mb']:.1f} MB" if result["peak_memory_mb"] else ""
+    print(f"        {result['requests_per_sec']:.1f} req/s | {result['businesses_per_min']:.0f} businesses/min | "
+          f"latency p50 {result['latency_p50_ms']:.0f} ms, p95 {result['latency_p95_ms']:.0f} ms{memory} | "
+          f"{result['wire_mb']:.1f} MB on the wire")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end crawl throughput against a local mock Google")
+    parser.add_argument("--scenario", choices=["scraper", "counties", "all"], default="all")
+    parser.add_argument("--engine", choices=["threads", "async", "both"], default="both")
+    parser.add_argument("--query", default="property management")
+    parser.add_argument("--searches", type=int, default=2, help="searches in the scraper scenario")
+    parser.add_argument("--state", default="OH")
+    parser.add_argument("--counties", type=int, default=3, help="counties in the county-loop scenario")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=50, help="mock latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--block-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--adaptive", action="store_true", help="let the AIMD controller move the limit")
+    parser.add_argument("--max-workers", type=int, default=20)
+    parser.add_argument("--host-rate", type=float, default=0, help="requests/sec per host, 0 = unpaced")
+    parser.add_argument("--fields", help='output column projection, e.g. "Name, Phone Number"')
+    parser.add_argument("--crawl-mode", choices=["detail", "cards", "hybrid"], help="override the crawl_mode setting")
+    parser.add_argument("--no-offline-geocode", dest="offline_geocode", action="store_false",
+                        help="send every address to the Geocoding API")
+    parser.add_argument("--stream", action="store_true", help="early-abort streaming detail downloads")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false")
+    parser.add_argument("--verbose", action="store_true", help="show scraper output")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    sys.path.insert(0, SCRIPT_DIR)
+    workdir = tempfile.mkdtemp(prefix="gmb_bench_")
+    os.chdir(workdir)
+
+    mock = MockGoogle(latency_ms=args.latency, error_rate=args.error_rate, block_rate=args.block_rate,
+                      pages=args.pages, per_page=args.per_page)
+    mock.start()
+    print(f"[BENCH] Mock Google on {mock.base_url}, working dir {workdir}")
+    try:
+        bench = Bench(mock, args)
+        scenarios = ["scraper", "counties"] if args.scenario == "all" else [args.scenario]
+        engines = ["threads", "async"] if args.engine == "both" else [args.engine]
+        results = []
+        for scenario in scenarios:
+            for engine in engines:
+                result = bench.measure(scenario, engine)
+                print_result(result)
+                results.append(result)
+    finally:
+        mock.stop()
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[BENCH] Results written to {json_path}")
+
+
+if __name__ == "__main__":
+    main()
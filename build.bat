@@ -11,7 +11,7 @@ echo Installing PyInstaller...
 pip install pyinstaller
 
 echo Building executable...
-pyinstaller --onefile --name "GMB_Scraper" main.py
+pyinstaller --onefile --add-data "extraction_schema.json;." --name "GMB_Scraper" main.py
 
 echo Build completed successfully!
 echo Your executable is in the 'dist' folder: GMB_Scraper.exe
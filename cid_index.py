@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Seen CID Index
+Run-wide set of business CIDs already queued or saved, optionally persisted to SQLite
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class SeenIndex:
+    """Decides once per business whether its detail page still needs fetching.
+
+    claim() is the check every county and worker goes through before queueing
+    a detail fetch: O(1) against an in-memory set, atomic across threads.
+    With a path, CIDs are written to SQLite under ``scope`` (query and
+    state), so resuming an interrupted job skips businesses it already wrote
+    out. mark_saved() only queues a CID; commit() persists the queue once
+    the records are on disk, so a crash never records a business as saved
+    that isn't in the output. clear() forgets the scope.
+    """
+
+    def __init__(self, path=None, scope=""):
+        self.path = path
+        self.scope = scope
+        self.avoided = 0
+        self.avoided_from_disk = 0
+        self._seen = set()
+        self._on_disk = set()
+        self._unsaved = set()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS seen (
+                    scope TEXT NOT NULL, cid TEXT NOT NULL, saved_at REAL NOT NULL,
+                    PRIMARY KEY (scope, cid))""")
+            self._db.commit()
+            rows = self._db.execute("SELECT cid FROM seen WHERE scope = ?", (scope,))
+            self._on_disk = {cid for (cid,) in rows}
+            self._seen = set(self._on_disk)
+            if self._on_disk:
+                print(f"[SEEN] {len(self._on_disk)} businesses already collected for '{scope}'")
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __contains__(self, cid):
+        return cid in self._seen
+
+    def claim(self, cid):
+        """True if this CID is new and the caller should fetch it, False to skip"""
+        if not cid:
+            return False
+        with self._lock:
+            if cid in self._seen:
+                self.avoided += 1
+                if cid in self._on_disk:
+                    self.avoided_from_disk += 1
+                return False
+            self._seen.add(cid)
+            return True
+
+    def mark_saved(self, cid):
+        """Queue a CID whose record was collected; commit() persists it"""
+        if not cid or self._db is None:
+            return
+        with self._lock:
+            self._unsaved.add(cid)
+
+    def commit(self):
+        """Persist every queued CID; call once their records have been written out"""
+        with self._lock:
+            if self._db is None or not self._unsaved:
+                return
+            now = time.time()
+            self._db.executemany("INSERT OR IGNORE INTO seen (scope, cid, saved_at) VALUES (?, ?, ?)",
+                                 ((self.scope, cid, now) for cid in self._unsaved))
+            self._db.commit()
+            self._on_disk |= self._unsaved
+            self._unsaved.clear()
+
+    def rollback(self):
+        """Drop the CIDs queued since the last commit(); their records never made it to disk"""
+        with self._lock:
+            self._unsaved.clear()
+
+    def clear(self):
+        """Forget every persisted CID of this scope, so the next run fetches them again"""
+        with self._lock:
+            if self._db is None:
+                return 0
+            cleared = self._db.execute("DELETE FROM seen WHERE scope = ?", (self.scope,)).rowcount
+            self._db.commit()
+            self._seen -= self._on_disk
+            self._on_disk.clear()
+            return cleared
+
+    def print_stats(self):
+        earlier = f" ({self.avoided_from_disk} from earlier runs)" if self._db is not None else ""
+        print(f"[SEEN] {len(self._seen)} unique businesses, {self.avoided} duplicate detail fetches "
+              f"avoided{earlier}")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
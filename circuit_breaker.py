@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Circuit Breakers
+Closed / open / half-open breakers per target host and per proxy session
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Stops all traffic to one endpoint after repeated failures.
+
+    CLOSED: requests flow; ``failure_threshold`` consecutive failures open it.
+    OPEN: nobody sends; callers of before_request() wait, which pauses the
+    crawl, until ``recovery_timeout`` has passed.
+    HALF_OPEN: ``half_open_max`` probe requests go out at a time while
+    everyone else keeps waiting. ``success_threshold`` successful probes close
+    the breaker; a failed probe re-opens it with the timeout doubled (capped at
+    ``max_recovery_timeout``).
+    """
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=60, half_open_max=1,
+                 success_threshold=2, max_recovery_timeout=900):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_recovery_timeout = recovery_timeout
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        self.half_open_max = half_open_max
+        self.success_threshold = success_threshold
+        self.state = CLOSED
+        self.transitions = {}
+        self.time_open = 0.0
+        self._failures = 0
+        self._successes = 0
+        self._probes = 0
+        self._opened_at = 0.0
+        self._tripped_at = 0.0
+        self._cond = threading.Condition()
+
+    def _transition(self, state, reason):
+        old, self.state = self.state, state
+        now = time.monotonic()
+        if old == CLOSED:
+            self._opened_at = self._tripped_at = now
+        elif state == CLOSED:
+            self.time_open += now - self._tripped_at
+        key = f"{old}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        print(f"[BREAKER] {self.name}: {old} -> {state} ({reason})")
+        self._cond.notify_all()
+
+    def seconds_open(self):
+        """Total time spent open or half-open, including the current trip"""
+        with self._cond:
+            current = time.monotonic() - self._tripped_at if self.state != CLOSED else 0.0
+            return self.time_open + current
+
+    def before_request(self):
+        """Wait until this breaker lets a request through"""
+        with self._cond:
+            while True:
+                if self.state == CLOSED:
+                    return
+                if self.state == OPEN:
+                    remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+                    if remaining > 0:
+                        self._cond.wait(remaining)
+                        continue
+                    self._probes = self._successes = 0
+                    self._transition(HALF_OPEN, f"probing after {self.recovery_timeout:.0f}s")
+                if self._probes < self.half_open_max:
+                    self._probes += 1
+                    return
+                self._cond.wait()
+
+    def record(self, ok):
+        """Report the outcome of a request let through by before_request()"""
+        with self._cond:
+            if self.state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if ok:
+                    self._successes += 1
+                    if self._successes >= self.success_threshold:
+                        self._failures = 0
+                        self.recovery_timeout = self.base_recovery_timeout
+                        self._transition(CLOSED, f"{self._successes} probes succeeded")
+                    else:
+                        self._cond.notify_all()
+                else:
+                    self.recovery_timeout = min(self.max_recovery_timeout, self.recovery_timeout * 2)
+                    self._opened_at = time.monotonic()
+                    self._transition(OPEN, f"probe failed, next probe in {self.recovery_timeout:.0f}s")
+            elif self.state == CLOSED:
+                if ok:
+                    self._failures = 0
+                    return
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._transition(OPEN, f"{self._failures} consecutive failures, "
+                                           f"pausing {self.recovery_timeout:.0f}s")
+
+
+class BreakerRegistry:
+    """One breaker per target host and one per proxy session"""
+
+    def __init__(self, failure_threshold=5, recovery_timeout=60, half_open_max=1, success_threshold=2):
+        self.settings = (failure_threshold, recovery_timeout, half_open_max, success_threshold)
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, *self.settings)
+            return breaker
+
+    def breakers_for(self, url, proxies=None):
+        breakers = [self._get(urlsplit(url).netloc)]
+        proxy_url = (proxies or {}).get("https") or (proxies or {}).get("http")
+        if proxy_url:
+            parts = urlsplit(proxy_url)
+            # Session identity is the proxy user (PacketStream encodes country/session there)
+            breakers.append(self._get(f"proxy {parts.username or ''}@{parts.hostname}:{parts.port}"))
+        return breakers
+
+    def before_request(self, url, proxies=None):
+        """Wait on every breaker guarding this request; return them for record()"""
+        breakers = self.breakers_for(url, proxies)
+        for breaker in breakers:
+            breaker.before_request()
+        return breakers
+
+    @staticmethod
+    def record(breakers, ok):
+        for breaker in breakers:
+            breaker.record(ok)
+
+    def print_stats(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            transitions = ", ".join(f"{k} x{v}" for k, v in sorted(breaker.transitions.items())) or "none"
+            print(f"[BREAKER] {breaker.name}: {breaker.state}, {breaker.seconds_open():.0f}s open, "
+                  f"transitions: {transitions}")
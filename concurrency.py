@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Adaptive Concurrency Controller
+Additive-increase / multiplicative-decrease limit on in-flight Google requests
+"""
+
+import threading
+import time
+
+
+class AIMDController:
+    """Resizable gate around outgoing requests.
+
+    Use as a context manager around each network call. Every window of clean
+    responses (one window = the current limit) raises the limit by
+    ``increase``; a block signal (429/503/"unusual traffic") multiplies it by
+    ``decrease``. Block signals that arrive within ``cooldown`` seconds of the
+    last cut come from requests already in flight and are ignored, so one burst
+    of blocks only halves the limit once.
+    """
+
+    def __init__(self, initial=5, minimum=1, maximum=20, increase=1, decrease=0.5, cooldown=5.0):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.in_flight = 0
+        self.blocks = 0
+        self._clean = 0
+        self._last_cut = 0.0
+        self._cond = threading.Condition()
+        self.history = [(time.time(), int(self.limit))]
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def on_success(self):
+        """Clean response: grow the limit by one step per full window"""
+        with self._cond:
+            self._clean += 1
+            if self._clean < int(self.limit) or self.limit >= self.maximum:
+                return
+            self._clean = 0
+            self._set_limit(min(self.maximum, self.limit + self.increase), "clean window")
+            self._cond.notify_all()
+
+    def on_block(self):
+        """Block signal: cut the limit multiplicatively"""
+        with self._cond:
+            self.blocks += 1
+            self._clean = 0
+            now = time.monotonic()
+            if now - self._last_cut < self.cooldown:
+                return
+            self._last_cut = now
+            self._set_limit(max(self.minimum, self.limit * self.decrease), "block signal")
+
+    def _set_limit(self, new_limit, reason):
+        old = int(self.limit)
+        self.limit = new_limit
+        if int(new_limit) != old:
+            self.history.append((time.time(), int(new_limit)))
+            print(f"[AIMD] Concurrency limit {old} -> {int(new_limit)} ({reason})")
+
+    def print_stats(self):
+        """Print the current limit and the range it moved through"""
+        limits = [limit for _, limit in self.history]
+        print(f"[AIMD] Limit now {int(self.limit)} (range {min(limits)}-{max(limits)}, "
+              f"{len(self.history) - 1} changes, {self.blocks} block signals)")
@@ -20,6 +20,7 @@ class CorrectedCreditTracker:
         # PacketStream tracking (REAL COSTS)
         self.packetstream_data_used_mb = 0
         self.packetstream_data_used_gb = 0
+        self.packetstream_decoded_mb = 0  # Body size after decompression, for the compression ratio
         self.packetstream_cost = 0
         self.packetstream_requests_made = 0
         self.packetstream_requests_failed = 0
@@ -53,6 +54,7 @@ class CorrectedCreditTracker:
                     # Load PacketStream stats
                     self.packetstream_data_used_mb = data.get("packetstream_data_used_mb", 0)
                     self.packetstream_data_used_gb = data.get("packetstream_data_used_gb", 0)
+                    self.packetstream_decoded_mb = data.get("packetstream_decoded_mb", 0)
                     self.packetstream_cost = data.get("packetstream_cost", 0)
                     self.packetstream_requests_made = data.get("packetstream_requests_made", 0)
                     
@@ -113,6 +115,7 @@ class CorrectedCreditTracker:
                 # PacketStream stats
                 "packetstream_data_used_mb": self.packetstream_data_used_mb,
                 "packetstream_data_used_gb": self.packetstream_data_used_gb,
+                "packetstream_decoded_mb": self.packetstream_decoded_mb,
                 "packetstream_cost": self.packetstream_cost,
                 "packetstream_requests_made": self.packetstream_requests_made,
                 "packetstream_requests_failed": self.packetstream_requests_failed,
@@ -183,8 +186,12 @@ class CorrectedCreditTracker:
         except Exception as e:
             print(f"❌ PacketStream test error: {e}")
     
-    def track_packetstream_request(self, response_size_bytes=0):
-        """Track PacketStream bandwidth usage (REAL COSTS)"""
+    def track_packetstream_request(self, response_size_bytes=0, decoded_size_bytes=None):
+        """Track PacketStream bandwidth usage (REAL COSTS)
+        
+        response_size_bytes is what crossed the wire (headers, compressed body,
+        TLS overhead); decoded_size_bytes is the body after decompression.
+        """
         # Convert bytes to MB/GB
         size_mb = response_size_bytes / (1024 * 1024)
         size_gb = size_mb / 1024
@@ -192,6 +199,9 @@ class CorrectedCreditTracker:
         # Update totals
         self.packetstream_data_used_mb += size_mb
         self.packetstream_data_used_gb += size_gb
+        if decoded_size_bytes is None:
+            decoded_size_bytes = response_size_bytes
+        self.packetstream_decoded_mb += decoded_size_bytes / (1024 * 1024)
         self.packetstream_requests_made += 1
         
         # Calculate cost
@@ -263,6 +273,9 @@ class CorrectedCreditTracker:
         # PacketStream Costs (REAL COSTS)
         print(f"\n PACKETSTREAM PROXY (REAL COSTS):")
         print(f"   Data Used: {self.packetstream_data_used_mb:.2f} MB")
+        if self.packetstream_decoded_mb:
+            saved = 1 - self.packetstream_data_used_mb / self.packetstream_decoded_mb
+            print(f"   Decoded Size: {self.packetstream_decoded_mb:.2f} MB (compression saved {saved:.0%})")
         print(f"   Cost: ${self.packetstream_cost:.6f}")
         print(f"   Requests Made: {self.packetstream_requests_made}")
         print(f"   Requests Failed: {self.packetstream_requests_failed}")
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Detail Page and Listing Card Extraction
+Declarative, versioned field schema compiled once into lxml XPaths and run in one pass per page
+"""
+
+import json
+import os
+import re
+import threading
+
+from lxml import etree
+from scrapy import Selector
+
+DEFAULT_SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extraction_schema.json")
+# Filled later from the Geocoding API, not from the page
+GEOCODED_COLUMNS = ("City", "State", "Zip Code")
+
+_local = threading.local()
+
+
+def _parser():
+    # lxml parsers must not be shared between threads
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = etree.HTMLParser(encoding="utf-8")
+    return parser
+
+
+def parse_tree(body):
+    """Parse raw response bytes (or a memoryview of them) into an lxml tree without decoding to str first"""
+    if not body:
+        return None
+    return etree.fromstring(body, _parser())
+
+
+def bytes_selector(body):
+    """Scrapy Selector straight from UTF-8 bytes; text= would decode to str and lxml re-encode it"""
+    return Selector(body=bytes(body) or b"<html></html>", encoding="utf-8")
+
+
+def _compile_step(step):
+    """One post-processor name ("first", "regex:q=(.*)/", ...) as a function of the value"""
+    name, _, arg = step.partition(":")
+    if name == "first":
+        return lambda v: (str(v[0]) if v else None) if isinstance(v, list) else v
+    if name == "join":
+        sep = arg or " "
+        return lambda v: sep.join(str(x) for x in v) if isinstance(v, list) else v
+    if name == "regex":
+        pattern = re.compile(arg)
+
+        def regex(v):
+            for text in (v if isinstance(v, list) else [v]):
+                match = pattern.search(str(text)) if text is not None else None
+                if match:
+                    # Several groups (street, city/state) come back joined into one value
+                    if pattern.groups > 1:
+                        return ", ".join(g for g in match.groups() if g)
+                    return match.group(1)
+            return None
+        return regex
+    if name == "split_first":
+        return lambda v: v.split(arg)[0] if v is not None else v
+    if name == "strip":
+        return lambda v: v.strip() if v is not None else v
+    if name == "replace":
+        old, _, new = arg.partition(":")
+        return lambda v: v.replace(old, new) if v is not None else v
+    if name == "append":
+        return lambda v: v + arg if v is not None else v
+    raise ValueError(f"Unknown post-processor: {step}")
+
+
+class _Selector:
+    """A compiled XPath plus its post-processors"""
+
+    def __init__(self, spec, default_post=("first",)):
+        self.source = spec["xpath"]
+        self.xpath = etree.XPath(self.source)
+        self.post = [_compile_step(step) for step in spec.get("post", default_post)]
+        self.default = spec.get("default")
+
+    def apply(self, values):
+        for step in self.post:
+            values = step(values)
+        return values
+
+    def __call__(self, node, memo=None):
+        if memo is None:
+            return self.apply(self.xpath(node))
+        values = memo.get(self.source)
+        if values is None:
+            values = memo[self.source] = self.xpath(node)
+        return self.apply(values)
+
+
+class ExtractionSchema:
+    """Compiled form of extraction_schema.json.
+
+    Each output column either lists ordered candidates (the first non-empty
+    result wins, otherwise "default") or, for tables, a row XPath with column
+    XPaths and a row format. Field-level "post" steps run on the winning value.
+    Counts which candidate won per field so dead selectors show up in
+    print_stats() instead of costing time on every page.
+    """
+
+    def __init__(self, spec, source="<dict>", unit="pages"):
+        self.version = spec.get("version", 0)
+        self.source = source
+        self.unit = unit
+        self.stream_tail_bytes = spec.get("stream", {}).get("tail_bytes", 2048)
+        self.fields = []
+        for column, field in spec["fields"].items():
+            if "rows" in field:
+                compiled = {
+                    "rows": etree.XPath(field["rows"]),
+                    "columns": [_Selector(c) for c in field["columns"]],
+                    "row_format": field.get("row_format", "{0}"),
+                    "separator": field.get("separator", ", "),
+                }
+            else:
+                compiled = {"candidates": [_Selector(c) for c in field["candidates"]]}
+            compiled["default"] = field.get("default", "" if "rows" in field else None)
+            compiled["marker"] = field.get("marker")
+            compiled["post"] = [_compile_step(step) for step in field.get("post", [])]
+            self.fields.append((column, compiled))
+        self.pages = 0
+        self.hits = {column: [0] * len(f.get("candidates", [None])) for column, f in self.fields}
+        self.misses = {column: 0 for column, _ in self.fields}
+        self.pages_by_column = {column: 0 for column, _ in self.fields}
+        self._lock = threading.Lock()
+
+        # Listing-card fields: same field format, XPaths relative to each card
+        self.cards = None
+        cards = spec.get("cards")
+        if cards:
+            self.cards = ExtractionSchema({"version": self.version, "fields": cards["fields"]},
+                                          f"{source}#cards", unit="cards")
+            self.card_xpath = etree.XPath(cards["card"])
+            self.card_cid = _Selector(cards["cid"])
+
+    @classmethod
+    def load(cls, path=DEFAULT_SCHEMA_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), path)
+
+    @property
+    def columns(self):
+        return [column for column, _ in self.fields] + list(GEOCODED_COLUMNS)
+
+    def stream_markers_for(self, columns=None):
+        """Byte markers of the selected columns, for the streaming fetch"""
+        return [field["marker"] for column, field in self.fields
+                if field["marker"] and (columns is None or column in columns)]
+
+    def extract(self, body, columns=None):
+        """(fields, winners): the record and, per column, the index of the winning candidate.
+
+        With ``columns``, only those output columns are extracted or returned.
+        """
+        root = parse_tree(body)
+        if root is None:
+            root = etree.Element("html")
+        return self.extract_node(root, columns)
+
+    def extract_node(self, root, columns=None):
+        """(fields, winners) for an already parsed element"""
+        memo = {}
+        record, winners = {}, {}
+        for column, field in self.fields:
+            if columns is not None and column not in columns:
+                continue
+            value, winner = None, None
+            if "rows" in field:
+                rows = field["rows"](root)
+                if rows:
+                    value = field["separator"].join(
+                        field["row_format"].format(*(self._column(c, row) for c in field["columns"]))
+                        for row in rows)
+                    winner = 0
+            else:
+                for index, candidate in enumerate(field["candidates"]):
+                    value = candidate(root, memo)
+                    if value:
+                        winner = index
+                        break
+            if winner is None:
+                value = field["default"]
+            for step in field["post"]:
+                value = step(value)
+            record[column] = value
+            winners[column] = winner
+        for column in GEOCODED_COLUMNS:
+            if columns is None or column in columns:
+                record.setdefault(column, "")
+        return record, winners
+
+    def extract_cards(self, root, columns=None):
+        """[(cid, record)] for every listing card under a parsed results page, in page order"""
+        if self.cards is None:
+            return []
+        cards = []
+        for node in self.card_xpath(root):
+            record, winners = self.cards.extract_node(node, columns)
+            self.cards.record_hits(winners)
+            cards.append((self.card_cid(node), record))
+        return cards
+
+    @staticmethod
+    def _column(selector, row):
+        value = selector(row)
+        return selector.default if value is None else value
+
+    def record_hits(self, winners):
+        with self._lock:
+            self.pages += 1
+            for column, winner in winners.items():
+                self.pages_by_column[column] += 1
+                if winner is None:
+                    self.misses[column] += 1
+                else:
+                    self.hits[column][winner] += 1
+
+    def dead_candidates(self, min_pages=50):
+        """(column, candidate index) pairs that never matched in at least min_pages pages"""
+        return [(column, index) for column, hits in self.hits.items()
+                if self.pages_by_column[column] >= min_pages
+                for index, count in enumerate(hits) if count == 0]
+
+    def print_stats(self):
+        if self.pages:
+            print(f"[SCHEMA] v{self.version}: {self.pages} {self.unit}")
+            for column, hits in self.hits.items():
+                pages = self.pages_by_column[column]
+                if not pages:
+                    continue
+                shares = ", ".join(f"#{i} {count / pages:.0%}" for i, count in enumerate(hits))
+                print(f"[SCHEMA]   {column}: {shares}, empty {self.misses[column] / pages:.0%}")
+            for column, index in self.dead_candidates():
+                print(f"[SCHEMA] {column} candidate #{index} never matched - consider dropping it")
+        if self.cards is not None:
+            self.cards.print_stats()
+
+
+_schemas = {}
+_schemas_lock = threading.Lock()
+
+
+def load_schema(path=DEFAULT_SCHEMA_PATH):
+    """Compiled schema for path, compiled once per process"""
+    with _schemas_lock:
+        schema = _schemas.get(path)
+        if schema is None:
+            schema = _schemas[path] = ExtractionSchema.load(path)
+        return schema
+
+
+def extract_with_hits(body, path=DEFAULT_SCHEMA_PATH, columns=None):
+    """(fields, winners) for one page; what parser worker processes send back"""
+    return load_schema(path).extract(body, columns)
+
+
+def extract_details(body, schema=None, columns=None):
+    """Extract one business record from detail page bytes with the schema.
+
+    Returns the same dict as the Selector path, with the geocoded columns
+    left empty, and counts which candidate produced each field.
+    """
+    schema = schema or load_schema()
+    record, winners = schema.extract(body, columns)
+    schema.record_hits(winners)
+    return record
+
+
+# Output columns of selector_details, in order
+SELECTOR_COLUMNS = ("Name", "Category", "Phone Number", "Hours", "Website", "Rating", "Address") + GEOCODED_COLUMNS
+
+
+def selector_details(body):
+    """The original Scrapy Selector extraction, kept as the reference for extract_details"""
+    response = bytes_selector(body)
+    name = response.css('h2[data-attrid="title"] span::text').get()
+    address = response.css('.w8qArf:contains(Address) + .LrzXr::text').get()
+    if not address:
+        address = response.xpath("//span[contains(*, 'Address')]/following::span[1]/text()").get()
+    phone = response.css('span:contains("Phone") + span a span::text').get()
+    hours = ', '.join(
+        [f"{row.css('td::text').get()}: {row.css('td+td::text').get('').replace('–', '-')}" for row in
+         response.css('table.WgFkxc tr')])
+    website = response.css('a:contains("Website")::attr(href)').re_first(r'q=(.*)/') or response.css(
+        'a:contains("Website")::attr(href)').get()
+    rating = response.css('.Aq14fc::text').get('0') + '/5'
+    cate = " ".join(response.xpath("//span[contains(@class, 'YhemCb')]//text()").getall()).split(" in ")[0].strip()
+
+    return {
+        "Name": name,
+        "Category": cate,
+        "Phone Number": phone,
+        "Hours": hours,
+        "Website": website,
+        "Rating": rating,
+        "Address": address,
+        "City": "",
+        "State": "",
+        "Zip Code": ""
+    }
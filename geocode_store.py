@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Geocode Store
+SQLite (WAL) cache of Geocoding API address components with batched commits and JSON migration
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# 1: keyed by the raw scraped address, 2: keyed by key(address)
+SCHEMA_VERSION = 2
+
+
+class GeocodeStore:
+    """Address -> address_components, read from memory and appended to SQLite.
+
+    put() is O(1): the entry goes into the in-memory map and a pending batch.
+    The batch is committed once ``flush_every`` entries or ``flush_seconds``
+    have accumulated, and on close(), so a new address never costs a rewrite
+    of the whole cache and no other thread waits on disk I/O per lookup.
+    WAL with synchronous=NORMAL syncs at checkpoints rather than per commit;
+    a crash can lose at most the last unflushed batch.
+
+    Entries are stored under ``key(address)`` (address_parser.address_key
+    in the scraper), so spellings of one address share an entry. A
+    ``legacy_json`` file (the old geocode_cache.json) is imported once and
+    renamed to *.migrated; rows from a raw-keyed store are re-keyed once.
+    """
+
+    def __init__(self, path="geocode_cache.sqlite", legacy_json=None, flush_every=50, flush_seconds=5.0,
+                 key=None):
+        self.path = path
+        self.key = key or (lambda address: address)
+        self.flush_every = max(1, flush_every)
+        self.flush_seconds = flush_seconds
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.batches = 0
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                address TEXT PRIMARY KEY, components TEXT NOT NULL, saved_at REAL NOT NULL)""")
+        self._db.commit()
+        migrated = legacy_json and os.path.exists(legacy_json) and self.migrate_json(legacy_json)
+        if key is not None and (migrated or self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION):
+            self.rekey()
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._db.commit()
+        self._cache = {address: json.loads(components)
+                       for address, components in self._db.execute("SELECT address, components FROM geocode")}
+
+    def migrate_json(self, legacy_json):
+        """Import a geocode_cache.json dict in one transaction and rename the file (raw keys; rekey() follows)"""
+        try:
+            with open(legacy_json, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[GEOCODE] Could not read {legacy_json} for migration: {e}")
+            return 0
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO geocode (address, components, saved_at) VALUES (?, ?, ?)",
+                ((address, json.dumps(comps, ensure_ascii=False), now) for address, comps in legacy.items()))
+        os.replace(legacy_json, legacy_json + ".migrated")
+        print(f"[GEOCODE] Migrated {len(legacy)} cached addresses from {legacy_json} to {self.path}")
+        return len(legacy)
+
+    def rekey(self):
+        """Move every row to its canonical key, merging spellings of the same address.
+
+        Where several rows merge, one with address components wins over an
+        empty (ZERO_RESULTS) one, then the most recent. Prints how many of the
+        cached addresses were duplicate spellings: lookups that used to miss
+        and now hit.
+        """
+        rows = self._db.execute("SELECT address, components, saved_at FROM geocode").fetchall()
+        merged = {}
+        for address, components, saved_at in rows:
+            key = self.key(address)
+            rank = (components != "[]", saved_at)
+            if key not in merged or rank > merged[key][0]:
+                merged[key] = (rank, components, saved_at)
+        with self._db:
+            self._db.execute("DELETE FROM geocode")
+            self._db.executemany(
+                "INSERT INTO geocode (address, components, saved_at) VALUES (?, ?, ?)",
+                ((key, components, saved_at) for key, (_, components, saved_at) in merged.items()))
+        if rows:
+            duplicates = len(rows) - len(merged)
+            print(f"[GEOCODE] Re-keyed {len(rows)} cached addresses to {len(merged)} canonical keys: "
+                  f"{duplicates} ({duplicates / len(rows):.0%}) were other spellings of a cached address")
+        return len(rows), len(merged)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, address):
+        return self.key(address) in self._cache
+
+    def get(self, address, default=None):
+        comps = self._cache.get(self.key(address))
+        with self._lock:
+            if comps is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return comps
+
+    def put(self, address, comps):
+        key = self.key(address)
+        with self._lock:
+            self._cache[key] = comps
+            self._pending[key] = comps
+            if (len(self._pending) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_seconds):
+                self._flush()
+
+    def _flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending or self._db is None:
+            return
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO geocode (address, components, saved_at) VALUES (?, ?, ?)",
+                ((key, json.dumps(comps, ensure_ascii=False), now) for key, comps in self._pending.items()))
+        self.writes += len(self._pending)
+        self.batches += 1
+        self._pending.clear()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def clear(self):
+        """Drop every cached address, in memory and on disk"""
+        with self._lock:
+            self._cache.clear()
+            self._pending.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM geocode")
+
+    def print_stats(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+        print(f"[GEOCODE] {len(self._cache)} cached addresses: {self.hits} hits, {self.misses} misses "
+              f"({self.hits / lookups:.0%} hit rate), {self.writes} written in {self.batches} batches, "
+              f"{len(self._pending)} pending")
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
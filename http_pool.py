@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Sessions
+Shared keep-alive sessions with one connection pool per target host and proxy
+"""
+
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from streaming import read_until
+from wire_accounting import wire_bytes
+
+
+class SessionPool:
+    """Thread-safe registry of requests sessions keyed by (host, proxy).
+
+    Each key gets its own session and HTTPAdapter so listing/detail pages on
+    www.google.com, geocodes on maps.googleapis.com and direct vs proxied
+    traffic never compete for the same sockets. Cookies are never stored so
+    every request looks exactly like the old bare requests.get() calls.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=20, archive=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.archive = archive
+        self.wire_bytes = 0
+        self.streamed = 0
+        self.stream_aborts = 0
+        self.stream_bytes_saved = 0
+        self.stream_aborts_unsized = 0
+        self._sessions = {}
+        self._connections_seen = {}
+        self._reconnects = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _proxy_key(proxies):
+        if not proxies:
+            return "direct"
+        return proxies.get("https") or proxies.get("http") or "direct"
+
+    def session_for(self, url, proxies=None):
+        """Return the shared session for this URL's host and proxy"""
+        key = (urlsplit(url).netloc, self._proxy_key(proxies))
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                      pool_maxsize=self.pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+        return session
+
+    def get(self, url, proxies=None, watch=None, **kwargs):
+        """Drop-in replacement for requests.get() over a pooled session.
+
+        With a streaming.MarkerWatch the body is read in chunks and the
+        download stops as soon as the watch is satisfied.
+        """
+        if self.archive is not None and self.archive.replaying:
+            response = self.archive.replay(url)
+            response.wire_bytes = 0
+            response.aborted, response.bytes_saved = False, 0
+            return response
+        session = self.session_for(url, proxies)
+        if watch is not None:
+            response = read_until(session.get(url, proxies=proxies or None, stream=True, **kwargs), watch)
+        else:
+            response = session.get(url, proxies=proxies or None, **kwargs)
+            response.aborted, response.bytes_saved = False, 0
+        proxy_url = None if self._proxy_key(proxies) == "direct" else self._proxy_key(proxies)
+        response.wire_bytes = wire_bytes(response, proxy_url, self._new_connections(session))
+        with self._lock:
+            self.wire_bytes += response.wire_bytes
+            if response.aborted:
+                # The closed connection is reopened, with a new handshake, by a later request
+                self._reconnects[session] = self._reconnects.get(session, 0) + 1
+            if watch is not None:
+                self.streamed += 1
+                self.stream_aborts += response.aborted
+                if response.bytes_saved is None:
+                    self.stream_aborts_unsized += 1
+                else:
+                    self.stream_bytes_saved += response.bytes_saved
+        if self.archive is not None:
+            self.archive.record(url, response)
+        return response
+
+    @staticmethod
+    def _connection_pools(adapter):
+        managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+        for manager in managers:
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is not None:
+                    yield pool
+
+    def _new_connections(self, session):
+        """Connections this session opened since the last call (each counted once)"""
+        total = sum(pool.num_connections for pool in self._connection_pools(session.get_adapter("https://")))
+        with self._lock:
+            new = max(0, total - self._connections_seen.get(session, 0))
+            self._connections_seen[session] = total
+            new += self._reconnects.pop(session, 0)
+        return new
+
+    def get_stats(self):
+        """Per-pool and total connection statistics"""
+        with self._lock:
+            items = list(self._sessions.items())
+
+        pools = {}
+        total_requests = 0
+        total_connections = 0
+        total_open = 0
+        for (host, proxy_key), session in items:
+            requests_made = 0
+            connections_made = 0
+            open_connections = 0
+            for pool in self._connection_pools(session.get_adapter("https://")):
+                requests_made += pool.num_requests
+                connections_made += pool.num_connections
+                idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                in_use = max(0, pool.pool.maxsize - pool.pool.qsize())
+                open_connections += idle + in_use
+            label = f"{host} via {'proxy' if proxy_key != 'direct' else 'direct'}"
+            pools[label] = {
+                "requests": requests_made,
+                "connections": connections_made,
+                "open_connections": open_connections,
+                "reuse_ratio": self._reuse_ratio(requests_made, connections_made),
+            }
+            total_requests += requests_made
+            total_connections += connections_made
+            total_open += open_connections
+
+        return {
+            "pools": pools,
+            "requests": total_requests,
+            "connections": total_connections,
+            "open_connections": total_open,
+            "reuse_ratio": self._reuse_ratio(total_requests, total_connections),
+            "wire_bytes": self.wire_bytes,
+            "streamed": self.streamed,
+            "stream_aborts": self.stream_aborts,
+            "stream_bytes_saved": self.stream_bytes_saved,
+            "stream_aborts_unsized": self.stream_aborts_unsized,
+        }
+
+    @staticmethod
+    def _reuse_ratio(requests_made, connections_made):
+        if not requests_made:
+            return 0.0
+        return max(0.0, 1 - connections_made / requests_made)
+
+    def print_stats(self):
+        """Print a one-line summary per pool"""
+        stats = self.get_stats()
+        print(f"[POOL] {stats['requests']} requests over {stats['connections']} connections "
+              f"(reuse {stats['reuse_ratio']:.0%}, open {stats['open_connections']}), "
+              f"{stats['wire_bytes'] / (1024 * 1024):.2f} MB on the wire")
+        if stats["streamed"]:
+            saved = f"{stats['stream_bytes_saved'] / (1024 * 1024):.2f} MB not downloaded"
+            if stats["stream_aborts_unsized"]:
+                # Chunked bodies without a Content-Length: what they saved can't be known
+                saved += f" ({stats['stream_aborts_unsized']} chunked, size unknown and not counted)"
+            print(f"[STREAM] {stats['stream_aborts']}/{stats['streamed']} detail downloads stopped early, {saved}")
+        for label, pool in stats["pools"].items():
+            print(f"[POOL]   {label}: {pool['requests']} requests, {pool['connections']} connections, "
+                  f"reuse {pool['reuse_ratio']:.0%}, open {pool['open_connections']}")
+
+    def close(self):
+        """Close every pooled session"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._connections_seen.clear()
+            self._reconnects.clear()
+        for session in sessions:
+            session.close()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Listing Page Byte Scanner
+Pulls card CIDs and the next-page link straight out of raw results page bytes, with the DOM as fallback
+"""
+
+import html
+import re
+
+from extraction import bytes_selector
+
+CARD_MARKER = re.compile(rb'jsname=["\']jXK9ad["\']')
+CID = re.compile(rb'data-cid=["\'](\d+)["\']')
+# Attribute names need whitespace before them: \b would also match data-id= and data-href=
+NEXT_LINK = re.compile(rb'<a\b[^>]*(?<=\s)id=["\'][^"\']*pnnext[^>]*>')
+HREF = re.compile(rb'(?<=\s)href=["\']([^"\']*)["\']')
+
+
+def scan_cids(body):
+    """Card CIDs in page order, or None when the scan can't be trusted.
+
+    Every card carries one jsname="jXK9ad" marker; if the number of distinct
+    data-cid values differs from the number of markers, the page has markup
+    the pattern doesn't understand and the caller should use dom_cids().
+    """
+    cards = len(CARD_MARKER.findall(body))
+    cids = list(dict.fromkeys(cid.decode("ascii") for cid in CID.findall(body)))
+    return cids if len(cids) == cards else None
+
+
+def dom_cids(body):
+    """The original Selector path: the first data-cid of every card"""
+    response = bytes_selector(body)
+    return [card.css('a::attr(data-cid)').get() for card in response.css('div div[jsname="jXK9ad"]')]
+
+
+def scan_next_page(body):
+    """href of the pnnext link (HTML-unescaped), or None on the last page"""
+    match = NEXT_LINK.search(body)
+    if match:
+        href = HREF.search(match.group(0))
+        if href:
+            return html.unescape(href.group(1).decode("utf-8"))
+    if b"pnnext" not in body:
+        return None
+    # Something called pnnext the pattern didn't match; let the DOM decide
+    return bytes_selector(body).xpath("//a[contains(@id, 'pnnext')]/@href").get()
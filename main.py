@@ -1,4 +1,5 @@
 import sys
+import multiprocessing
 import os
 
 # Force UTF-8 encoding for Windows - remove problematic chcp command
@@ -10,7 +11,6 @@ if sys.platform == "win32":
         # Fallback for older Python versions
         pass
 
-from Google import Scraper
 import requests
 import time
 import json
@@ -20,6 +20,8 @@ from counties_data import counties_data
 from credit_tracker import CorrectedCreditTracker
 from datetime import datetime
 from Utils import proxy_user, proxy_pass, AUTOSAVE_EVERY_COUNTIES, SHUFFLE_COUNTIES, RESUME
+from Utils import PERSIST_SEEN_CIDS, RESET_SEEN_CIDS, SEEN_CIDS_PATH, OUTPUT_FIELDS
+from cid_index import SeenIndex
 
 def print_welcome_banner():
     """Print a stylish welcome banner"""
@@ -227,6 +229,95 @@ def check_packetstream_before_scraping():
         print(f"❌ Error: {e}")
         return False
 
+def scrape_counties(base_search, selected_state, selected_counties, credit_tracker, filenm_base, output_filename,
+                    fields=None):
+    """Scrape every selected county and return the combined business records"""
+    # Imported here, not at the top: parser worker processes re-import this script, and Google
+    # opens the caches and the replay archive as it loads
+    from Google import Scraper
+
+    all_state_data = [] # Collect data from all counties
+
+    completed_path = "completed_counties.txt"
+    completed = set()
+    if RESUME and os.path.exists(completed_path):
+        with open(completed_path, "r", encoding="utf-8") as f:
+            completed = {line.strip() for line in f if line.strip()}
+
+    # One index for every county: neighbouring search radii overlap, so the same
+    # business would otherwise be fetched, geocoded and paid for again
+    seen = SeenIndex(SEEN_CIDS_PATH if RESUME and PERSIST_SEEN_CIDS else None,
+                     scope=f"{base_search}|{selected_state}")
+    if RESET_SEEN_CIDS:
+        print(f"[SEEN] reset_seen_cids: forgot {seen.clear()} businesses saved by earlier runs of this job")
+    failed = 0
+
+    if SHUFFLE_COUNTIES:
+        random.shuffle(selected_counties)
+
+    for i, county in enumerate(selected_counties, 1):
+        county_full = f"{county['name']}, {selected_state}"
+        if RESUME and f"{county['name']},{selected_state}" in completed:
+            print(f"[RESUME] Skipping already completed: {county_full}")
+            continue
+        
+        search_term = f"{base_search} in {county_full}"
+        
+        print(f"\n[PROGRESS] County {i}/{len(selected_counties)}: {county_full}")
+        print(f" Coords: {county['lat']:.4f}, {county['lon']:.4f}")
+        print(f"[SEARCH] Search term: {search_term}")
+        
+        try:
+            # Create scraper for each county
+            s = Scraper(search_term, "", county['lat'], county['lon'], credit_tracker, seen, fields)
+            county_data = s.start_and_return_data()
+
+            # Track credits used for this query/county
+            # Each business address lookup uses 1 geocoding API call
+            businesses_found = len(county_data)
+            
+            # Track query statistics (no costs, just usage)
+            credit_tracker.track_query(
+                query=base_search,
+                state=selected_state,
+                county=county['name'],
+                businesses_found=businesses_found
+            )
+            
+            print(f"[SUCCESS] Completed {county['name']} - {businesses_found} businesses found")
+            print(f"[USAGE] Businesses found: {businesses_found}")
+            print(f"[PACKETSTREAM] Cost so far: ${credit_tracker.packetstream_cost:.2f}")
+            print(f"[GOOGLE API] Requests: {credit_tracker.google_api_requests_made}")
+
+            # Add county information to each business record
+            for business in county_data:
+                business['County'] = county['name']
+                business['State'] = selected_state
+                all_state_data.append(business)
+            
+            if AUTOSAVE_EVERY_COUNTIES > 0 and (i % AUTOSAVE_EVERY_COUNTIES == 0):
+                pd.DataFrame(all_state_data).to_excel(output_filename, index=False)
+                print(f"[AUTOSAVE] Progress saved to {output_filename}")
+                # Only now are these businesses in a file a resumed run can rely on
+                seen.commit()
+
+            if RESUME:
+                with open(completed_path, "a", encoding="utf-8") as f:
+                    f.write(f"{county['name']},{selected_state}\n")
+
+        except Exception as e:
+            print(f"[ERROR] Error scraping {county['name']}: {e}")
+            failed += 1
+            seen.rollback()
+            continue
+
+    seen.print_stats()
+    if not failed:
+        # The job is done: a later run of the same query is a refresh and should see every business again
+        seen.clear()
+    seen.close()
+    return all_state_data
+
 def main():
     # Print stylish welcome banner
     print_welcome_banner()
@@ -295,6 +386,7 @@ def main():
     print(f"State: {selected_state}")
     print(f"Counties: {len(selected_counties)} counties selected")
     print(f"Output File: {output_filename}")
+    print(f"Fields: {OUTPUT_FIELDS or 'all'}")
     confirm = input("\n Start scraping? (y/n): ").strip().lower()
     if confirm not in ['y', 'yes']:
         print("[CANCELLED] Scraping cancelled.")
@@ -304,69 +396,8 @@ def main():
     start_time = time.time()
     print(f"\n[TIME] Start time: {time.strftime('%H:%M:%S')}")
     
-    all_state_data = [] # Collect data from all counties
-
-    completed_path = "completed_counties.txt"
-    completed = set()
-    if RESUME and os.path.exists(completed_path):
-        with open(completed_path, "r", encoding="utf-8") as f:
-            completed = {line.strip() for line in f if line.strip()}
-
-    if SHUFFLE_COUNTIES:
-        random.shuffle(selected_counties)
-
-    for i, county in enumerate(selected_counties, 1):
-        county_full = f"{county['name']}, {selected_state}"
-        if RESUME and f"{county['name']},{selected_state}" in completed:
-            print(f"[RESUME] Skipping already completed: {county_full}")
-            continue
-        
-        search_term = f"{base_search} in {county_full}"
-        
-        print(f"\n[PROGRESS] County {i}/{len(selected_counties)}: {county_full}")
-        print(f" Coords: {county['lat']:.4f}, {county['lon']:.4f}")
-        print(f"[SEARCH] Search term: {search_term}")
-        
-        try:
-            # Create scraper for each county
-            out_name = f"{filenm_base} - {county['name']}_{selected_state}"
-            s = Scraper(search_term, "", county['lat'], county['lon'], credit_tracker)
-            county_data = s.start_and_return_data()
-
-            # Track credits used for this query/county
-            # Each business address lookup uses 1 geocoding API call
-            businesses_found = len(county_data)
-            
-            # Track query statistics (no costs, just usage)
-            credit_tracker.track_query(
-                query=base_search,
-                state=selected_state,
-                county=county['name'],
-                businesses_found=businesses_found
-            )
-            
-            print(f"[SUCCESS] Completed {county['name']} - {businesses_found} businesses found")
-            print(f"[USAGE] Businesses found: {businesses_found}")
-            print(f"[PACKETSTREAM] Cost so far: ${credit_tracker.packetstream_cost:.2f}")
-            print(f"[GOOGLE API] Requests: {credit_tracker.google_api_requests_made}")
-
-            # Add county information to each business record
-            for business in county_data:
-                business['County'] = county['name']
-                business['State'] = selected_state
-                all_state_data.append(business)
-            
-            if AUTOSAVE_EVERY_COUNTIES > 0 and (i % AUTOSAVE_EVERY_COUNTIES == 0):
-                pd.DataFrame(all_state_data).to_excel(output_filename, index=False)
-                print(f"[AUTOSAVE] Progress saved to {output_filename}")
-
-            if RESUME:
-                with open(completed_path, "a", encoding="utf-8") as f:
-                    f.write(f"{county['name']},{selected_state}\n")
-
-        except Exception as e:
-            print(f"[ERROR] Error scraping {county['name']}: {e}")
-            continue
+    all_state_data = scrape_counties(base_search, selected_state, selected_counties,
+                                     credit_tracker, filenm_base, output_filename, OUTPUT_FIELDS)
     
     total_time = time.time() - start_time
     print(f"\n[SUCCESS] All counties completed in {total_time:.1f} seconds")
@@ -391,6 +422,8 @@ def main():
     credit_tracker.get_final_report()
 
 if __name__ == '__main__':
+    # Parser worker processes re-enter this script in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
     
     # Keep the window open after completion
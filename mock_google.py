@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Mock Google Endpoint
+Local stand-in for Google local search, lcl_akp detail fragments and the Geocoding API
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+# (city, county, state, zip) - real places so ZIPs agree with their state
+PLACES = [
+    ("Columbus", "Franklin County", "OH", "43215"),
+    ("Cleveland", "Cuyahoga County", "OH", "44114"),
+    ("Cincinnati", "Hamilton County", "OH", "45202"),
+    ("Dayton", "Montgomery County", "OH", "45402"),
+    ("Toledo", "Lucas County", "OH", "43604"),
+    ("Austin", "Travis County", "TX", "78701"),
+    ("Dallas", "Dallas County", "TX", "75201"),
+    ("Houston", "Harris County", "TX", "77002"),
+    ("Denver", "Denver County", "CO", "80202"),
+    ("Miami", "Miami-Dade County", "FL", "33130"),
+    ("Orlando", "Orange County", "FL", "32801"),
+    ("Atlanta", "Fulton County", "GA", "30303"),
+    ("Chicago", "Cook County", "IL", "60601"),
+    ("Phoenix", "Maricopa County", "AZ", "85004"),
+    ("Seattle", "King County", "WA", "98101"),
+    ("Portland", "Multnomah County", "OR", "97204"),
+    ("Nashville", "Davidson County", "TN", "37203"),
+    ("Raleigh", "Wake County", "NC", "27601"),
+    ("Boston", "Suffolk County", "MA", "02108"),
+    ("Albany", "Albany County", "NY", "12207"),
+]
+
+STATE_NAMES = {
+    "OH": "Ohio", "TX": "Texas", "CO": "Colorado", "FL": "Florida", "GA": "Georgia",
+    "IL": "Illinois", "AZ": "Arizona", "WA": "Washington", "OR": "Oregon",
+    "TN": "Tennessee", "NC": "North Carolina", "MA": "Massachusetts", "NY": "New York",
+}
+
+STREETS = ["Main", "High", "Oak", "Maple", "Broad", "Market", "Lake", "Park", "Elm", "Washington"]
+SUFFIXES = [("St", "Street"), ("Ave", "Avenue"), ("Rd", "Road"), ("Blvd", "Boulevard"), ("Dr", "Drive")]
+DIRECTIONS = [("", ""), ("N ", "North "), ("S ", "South "), ("E ", "East "), ("W ", "West ")]
+UNITS = ["", "", "", " Ste 200", " Unit 4", " #12"]
+NAME_WORDS = ["Acme", "Summit", "Riverside", "Golden", "Liberty", "Pioneer", "Evergreen", "Premier", "Cedar", "Union"]
+CATEGORIES = ["Property management company", "Real estate agency", "Mobile home park", "Plumber", "Electrician"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+BLOCK_PAGE = (b"<html><head><title>Sorry...</title></head><body><div>Our systems have detected "
+              b"unusual traffic from your computer network.</div></body></html>")
+
+ADDRESS_PATTERN = re.compile(
+    r"^(?P<number>\d+)\s+(?P<street>[^,]+?)(?:\s+(?:Ste|Unit|#)\s*\S+)?,\s*(?P<city>[^,]+),\s*"
+    r"(?P<state>[A-Z]{2})\s+(?P<zip>\d{5})")
+
+
+def _rng(*parts):
+    return random.Random(zlib.crc32("|".join(str(p) for p in parts).encode("utf-8")))
+
+
+def business(cid, keyword="business"):
+    """Deterministic fake business for a CID"""
+    rng = _rng("business", cid)
+    city, county, state, zip_code = rng.choice(PLACES)
+    short_dir, _ = rng.choice(DIRECTIONS)
+    short_suffix, _ = rng.choice(SUFFIXES)
+    street = f"{short_dir}{rng.choice(STREETS)} {short_suffix}"
+    number = rng.randint(10, 9999)
+    unit = rng.choice(UNITS)
+    return {
+        "cid": cid,
+        "name": f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {keyword.title()}",
+        "category": rng.choice(CATEGORIES),
+        "phone": f"({rng.randint(200, 989)}) {rng.randint(200, 989)}-{rng.randint(1000, 9999)}",
+        "website": f"https://www.{rng.choice(NAME_WORDS).lower()}{cid % 1000}.com/",
+        "rating": f"{rng.uniform(3.0, 5.0):.1f}",
+        "reviews": rng.randint(1, 900),
+        "street": f"{number} {street}{unit}",
+        "address": f"{number} {street}{unit}, {city}, {state} {zip_code}",
+        "city": city,
+        "state": state,
+        "zip": zip_code,
+        "hours": [(day, "Closed" if day == "Sunday" else f"{rng.randint(7, 10)} AM–{rng.randint(4, 9)} PM")
+                  for day in DAYS],
+    }
+
+
+def _padding(rng, size):
+    # Filler standing in for Google's inline scripts: a quarter random, the rest repetitive,
+    # which compresses roughly as well as the real pages do
+    noise = base64.b64encode(rng.randbytes(size // 4 * 3 // 4 + 3)).decode("ascii")[:size // 4]
+    chunk = "function(a,b){return a&&b.call(this,a)};var w=window,d=document;"
+    text = noise + chunk * ((size - len(noise)) // len(chunk) + 1)
+    return f"<script>var _pad='{text[:size]}';</script>"
+
+
+def listing_page(query, rllag="", start=0, pages=3, per_page=20, page_kb=60):
+    """Results page in the tbm=lcl layout with data-cid cards and pnnext pagination"""
+    keyword = query.split(" in ")[0]
+    area = ",".join(f"{float(v):.0f}" for v in rllag.split(",")[:2]) if rllag else ""
+    rng = _rng("listing", keyword, area, start)
+    cards = []
+    for index in range(per_page):
+        cid = zlib.crc32(f"{keyword}|{area}|{start + index}".encode("utf-8")) * 1000003 % (10 ** 19)
+        b = business(cid, keyword)
+        cards.append(
+            f'<div jsname="jXK9ad" class="uMdZh"><div class="VkpGBb">'
+            f'<a class="vwVdIc" data-cid="{cid}" href="#" role="button">'
+            f'<div class="dbg0pd" role="heading" aria-level="3"><span class="OSrXXb">{b["name"]}</span></div>'
+            f'<div class="rllt__details"><div><span class="Y0A0hc"><span class="yi40Hd YrbPuc">{b["rating"]}</span>'
+            f'<span class="RDApEe YrbPuc">({b["reviews"]})</span></span> · {b["category"]}</div>'
+            f'<div>{b["street"]} · {b["city"]}, {b["state"]}</div><div>{b["phone"]}</div></div></a></div></div>')
+    page = start // per_page
+    next_link = ""
+    if page + 1 < pages:
+        next_link = (f'<table class="AaVjTc"><tr><td><a id="pnnext" href="/search?q={quote_plus(query)}'
+                     f'&amp;rllag={rllag}&amp;tbm=lcl&amp;start={start + per_page}">Next</a></td></tr></table>')
+    filler = _padding(rng, page_kb * 1024 // 2)
+    return (f'<!doctype html><html><head><title>{query} - Google Search</title>{filler}</head><body>'
+            f'<div id="search"><div jsname="GZq3Ke">{"".join(cards)}</div></div>{next_link}'
+            f'{filler}</body></html>').encode("utf-8")
+
+
+def detail_page(cid, keyword="business", detail_kb=40):
+    """lcl_akp knowledge-panel fragment matching the selectors in Scraper.parse_details"""
+    b = business(cid, keyword)
+    rng = _rng("detail", cid)
+    hours = "".join(f"<tr><td>{day}</td><td>{span}</td></tr>" for day, span in b["hours"])
+    body = (
+        f'<div class="kp-wholepage"><h2 data-attrid="title" class="qrShPb"><span>{b["name"]}</span></h2>'
+        f'<div class="zloOqf"><span class="YhemCb">{b["category"]} in {b["city"]}, {b["state"]}</span></div>'
+        f'<div><span class="Aq14fc">{b["rating"]}</span><span class="hqzQac">'
+        f'<a data-sort_by="qualityScore" href="#"><span>{b["reviews"]} Google reviews</span></a></span></div>'
+        f'<div class="zloOqf"><span class="w8qArf"><a href="#">Address</a>: </span>'
+        f'<span class="LrzXr">{b["address"]}</span></div>'
+        f'<div class="zloOqf"><span class="w8qArf"><a href="#">Phone</a>: </span>'
+        f'<span class="LrzXr zdqRlf"><a href="#"><span>{b["phone"]}</span></a></span></div>'
+        f'<div><a class="ab_button" href="/url?q={b["website"]}&amp;sa=U">Website</a></div>'
+        f'<table class="WgFkxc">{hours}</table></div>')
+    size = detail_kb * 1024
+    return (_padding(rng, size // 4) + body + _padding(rng, size * 3 // 4)).encode("utf-8")
+
+
+def geocode_json(address):
+    """Geocoding API response with the address_components the scraper reads"""
+    match = ADDRESS_PATTERN.match(address or "")
+    if not match:
+        return json.dumps({"results": [], "status": "ZERO_RESULTS"}).encode("utf-8")
+    street = match.group("street")
+    for short, full in DIRECTIONS[1:]:
+        if street.startswith(short):
+            street = full + street[len(short):]
+    for short, full in SUFFIXES:
+        if street.endswith(" " + short):
+            street = street[:-len(short)] + full
+    county = next((p[1] for p in PLACES if p[0] == match.group("city")), "")
+    state = match.group("state")
+    components = [
+        {"long_name": match.group("number"), "short_name": match.group("number"), "types": ["street_number"]},
+        {"long_name": street, "short_name": match.group("street"), "types": ["route"]},
+        {"long_name": match.group("city"), "short_name": match.group("city"), "types": ["locality", "political"]},
+        {"long_name": county, "short_name": county, "types": ["administrative_area_level_2", "political"]},
+        {"long_name": STATE_NAMES.get(state, state), "short_name": state,
+         "types": ["administrative_area_level_1", "political"]},
+        {"long_name": "United States", "short_name": "US", "types": ["country", "political"]},
+        {"long_name": match.group("zip"), "short_name": match.group("zip"), "types": ["postal_code"]},
+    ]
+    return json.dumps({"results": [{"address_components": components}], "status": "OK"}).encode("utf-8")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading early (streaming fetches) just hang up
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockGoogle:
+    """Threaded HTTP server serving listing pages, detail fragments and geocodes.
+
+    ``latency_ms`` is the mean added delay (uniform +/-50%), ``error_rate`` the
+    share of HTTP 500s and ``block_rate`` the share of block responses (half
+    429s, half 200 "unusual traffic" pages).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0, error_rate=0.0, block_rate=0.0,
+                 pages=3, per_page=20, page_kb=60, detail_kb=40):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.block_rate = block_rate
+        self.pages = pages
+        self.per_page = per_page
+        self.page_kb = page_kb
+        self.detail_kb = detail_kb
+        self.stats = {"listing": 0, "detail": 0, "geocode": 0, "errors": 0, "blocks": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self._server = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, key, size=0):
+        with self._lock:
+            self.stats[key] += 1
+            self.stats["bytes"] += size
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; with Nagle on, every request on a reused
+            # keep-alive connection would wait ~40 ms for the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type="text/html; charset=UTF-8"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                if len(body) > 1024 and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, 6)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with mock._lock:
+                    roll = mock._random.random()
+                    delay = mock.latency_ms * mock._random.uniform(0.5, 1.5) / 1000
+                if delay:
+                    time.sleep(delay)
+
+                if url.path.startswith("/maps/api/geocode/json"):
+                    body = geocode_json(params.get("address", ""))
+                    mock._count("geocode", len(body))
+                    return self._send(200, body, "application/json; charset=UTF-8")
+
+                if roll < mock.error_rate:
+                    mock._count("errors")
+                    return self._send(500, b"<html><body>Server Error</body></html>")
+                if roll < mock.error_rate + mock.block_rate:
+                    mock._count("blocks")
+                    if roll < mock.error_rate + mock.block_rate / 2:
+                        return self._send(429, BLOCK_PAGE)
+                    return self._send(200, BLOCK_PAGE)
+
+                if url.path == "/search":
+                    body = listing_page(params.get("q", ""), params.get("rllag", ""),
+                                        int(params.get("start", 0)), mock.pages, mock.per_page, mock.page_kb)
+                    mock._count("listing", len(body))
+                    return self._send(200, body)
+                if url.path == "/async/lcl_akp":
+                    match = re.search(r"ludocids:(\d+)", params.get("async", ""))
+                    if not match:
+                        return self._send(400, b"")
+                    body = detail_page(int(match.group(1)), params.get("q", "business").split(" in ")[0],
+                                       mock.detail_kb)
+                    mock._count("detail", len(body))
+                    return self._send(200, body)
+                self._send(404, b"")
+
+        return Handler
+
+    def start(self):
+        """Serve on a background thread; return the base URL"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Google endpoints the scraper uses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--latency", type=float, default=0, help="mean added latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--block-rate", type=float, default=0.0)
+    parser.add_argument("--pages", type=int, default=3, help="result pages per search")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--page-kb", type=int, default=60)
+    parser.add_argument("--detail-kb", type=int, default=40)
+    args = parser.parse_args()
+
+    mock = MockGoogle(args.host, args.port, args.latency, args.error_rate, args.block_rate,
+                      args.pages, args.per_page, args.page_kb, args.detail_kb)
+    print(f"[MOCK] Serving on {mock.base_url} (Ctrl+C to stop)")
+    try:
+        mock._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock._server.server_close()
+        print(f"[MOCK] {mock.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Parse Process Pool
+Runs detail page extraction in worker processes so fetch threads only do I/O
+"""
+
+import concurrent.futures
+import functools
+import multiprocessing
+import threading
+import time
+
+from extraction import extract_with_hits, load_schema, selector_details
+
+
+def _warm_up(schema_path=None):
+    # lxml/scrapy imports and schema compilation happen once per worker here
+    if schema_path:
+        load_schema(schema_path)
+    return True
+
+
+class ParsePool:
+    """ProcessPoolExecutor that turns raw detail page bytes into field dicts.
+
+    Bytes go in and plain dicts come out, so only cheap pickles cross the
+    process boundary and DOM building never holds the GIL of the crawling
+    process. The pool is started on first use; the workers re-import the main
+    script without running it, as with any spawned process. Worker functions
+    live in extraction, which has no import-time side effects, and entry
+    scripts import Google (SQLite stores, replay archive) inside functions so
+    the workers never load it.
+
+    With an extraction schema the workers compile it from its file and send
+    back which candidates won, so the hit counters live in this process.
+    """
+
+    def __init__(self, processes, parser="lxml", schema=None):
+        self.processes = max(1, processes)
+        self.schema = schema if parser == "lxml" else None
+        if self.schema:
+            self.parse_fn = functools.partial(extract_with_hits, path=self.schema.source)
+        else:
+            self.parse_fn = selector_details
+        self.parsed = 0
+        self.bytes_in = 0
+        self.wait_seconds = 0.0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn everywhere: forking a process full of fetch threads is unsafe
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+                schema_path = self.schema.source if self.schema else None
+                for future in [self._executor.submit(_warm_up, schema_path) for _ in range(self.processes)]:
+                    future.result()
+                print(f"[PARSE] Started {self.processes} parser processes")
+            return self._executor
+
+    def submit(self, body, columns=None):
+        """Future resolving to the field dict for one detail page"""
+        if self.schema:
+            # By keyword: parse_fn already binds path, the second positional parameter
+            return self._pool().submit(self.parse_fn, body, columns=columns)
+        return self._pool().submit(self.parse_fn, body)
+
+    def parse(self, body, columns=None):
+        """Parse one detail page in a worker process and wait for its fields"""
+        future = self.submit(body, columns)
+        started = time.perf_counter()
+        fields = future.result()
+        if self.schema:
+            fields, winners = fields
+            self.schema.record_hits(winners)
+        with self._lock:
+            self.parsed += 1
+            self.bytes_in += len(body or b"")
+            self.wait_seconds += time.perf_counter() - started
+        return fields
+
+    def print_stats(self):
+        if not self.parsed:
+            return
+        print(f"[PARSE] {self.parsed} pages ({self.bytes_in / (1024 * 1024):.1f} MB) parsed in "
+              f"{self.processes} processes, avg wait {self.wait_seconds * 1000 / self.parsed:.1f} ms/page")
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
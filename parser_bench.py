@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Detail Parser Microbenchmark
+Times the precompiled lxml extraction against the Scrapy Selector path on a corpus of detail pages
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import os
+import time
+
+from extraction import extract_details, load_schema, selector_details
+from mock_google import detail_page
+from parse_pool import ParsePool
+
+
+def load_corpus(corpus_dir=None, pages=200, detail_kb=40):
+    """Detail page bodies from *.html files in corpus_dir, or generated by the mock endpoint"""
+    if corpus_dir:
+        bodies = []
+        for path in sorted(glob.glob(os.path.join(corpus_dir, "**", "*.html"), recursive=True)):
+            with open(path, "rb") as f:
+                bodies.append(f.read())
+        return bodies
+    return [detail_page(1000003 * (i + 1), "property management", detail_kb) for i in range(pages)]
+
+
+def time_parser(parse, bodies, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for body in bodies:
+            parse(body)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_threaded(parse, bodies, threads):
+    """Wall time for fetch-style threads that each parse their own pages"""
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(parse, bodies))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lxml vs Scrapy Selector detail page extraction")
+    parser.add_argument("--corpus", help="directory of saved detail pages (*.html); default: generated")
+    parser.add_argument("--pages", type=int, default=200, help="generated pages when no --corpus")
+    parser.add_argument("--detail-kb", type=int, default=40, help="size of generated pages")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="also compare N fetch threads parsing in-thread vs through a ParsePool of N processes")
+    args = parser.parse_args()
+
+    bodies = load_corpus(args.corpus, args.pages, args.detail_kb)
+    if not bodies:
+        parser.error(f"no *.html files under {args.corpus}")
+    total_mb = sum(len(b) for b in bodies) / (1024 * 1024)
+    print(f"[BENCH] {len(bodies)} detail pages, {total_mb:.1f} MB")
+
+    mismatches = sum(1 for body in bodies if extract_details(body) != selector_details(body))
+    if mismatches:
+        print(f"[WARNING] lxml and Selector disagree on {mismatches} pages")
+
+    results = {}
+    for name, parse in (("selector", selector_details), ("lxml", extract_details)):
+        elapsed = time_parser(parse, bodies, args.repeat)
+        results[name] = elapsed
+        print(f"[BENCH] {name:8}: {elapsed * 1000 / len(bodies):.2f} ms/page, "
+              f"{len(bodies) / elapsed:.0f} pages/s")
+    print(f"[BENCH] lxml speedup: {results['selector'] / results['lxml']:.1f}x")
+
+    if args.processes:
+        pool = ParsePool(args.processes, "lxml", load_schema())
+        try:
+            pool.parse(bodies[0])
+            in_thread = time_threaded(extract_details, bodies, args.processes)
+            in_pool = time_threaded(pool.parse, bodies, args.processes)
+        finally:
+            pool.close()
+        print(f"[BENCH] {args.processes} threads, in-thread: {len(bodies) / in_thread:.0f} pages/s")
+        print(f"[BENCH] {args.processes} threads, process pool: {len(bodies) / in_pool:.0f} pages/s "
+              f"({in_thread / in_pool:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
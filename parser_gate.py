@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Parser Regression Gate
+Runs get_listings and detail extraction over the fixture corpus; fails on field diffs, byte/DOM scan
+disagreement or a throughput drop
+"""
+
+import argparse
+import base64
+import contextlib
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(SCRIPT_DIR, "fixtures", "corpus", "v1")
+STAGES = ("listing", "detail")
+
+
+def load_documents(corpus):
+    """{stage: {file name: bytes}} for every *.html under corpus/listing and corpus/detail"""
+    documents = {}
+    for stage in STAGES:
+        directory = os.path.join(corpus, stage)
+        documents[stage] = {}
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".html"):
+                with open(os.path.join(directory, name), "rb") as f:
+                    documents[stage][name] = f.read()
+    return documents
+
+
+def import_archive(archive, corpus):
+    """Copy 200 listing and detail responses from a replay archive into a corpus directory"""
+    from response_cache import detail_cid
+    counts = {stage: 0 for stage in STAGES}
+    for stage in STAGES:
+        os.makedirs(os.path.join(corpus, stage), exist_ok=True)
+    with gzip.open(archive, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["status"] != 200:
+                continue
+            cid = detail_cid(entry["url"])
+            if cid:
+                stage, name = "detail", f"{cid}.html"
+            elif "tbm=lcl" in entry["url"]:
+                stage, name = "listing", f"page_{counts['listing'] + 1:03d}.html"
+            else:
+                continue
+            with open(os.path.join(corpus, stage, name), "wb") as out:
+                out.write(base64.b64decode(entry["body"]))
+            counts[stage] += 1
+    print(f"[GATE] Imported {counts['listing']} listing and {counts['detail']} detail pages into {corpus}")
+
+
+class Gate:
+    """Extracts every corpus document with the scraper's own code paths"""
+
+    def __init__(self, parser=None):
+        # Imported here so the scraper's relative cache files land in the temp dir
+        import Google
+        self.google = Google
+        Google.DETAIL_CACHE = None
+        Google.PARSE_POOL = None
+        if parser:
+            Google.PARSER = parser
+            # As Google sets up at import: the schema (and with it cards and streaming) only exists for lxml
+            Google.SCHEMA = Google.load_schema(Google.EXTRACTION_SCHEMA) if parser == "lxml" else None
+            if Google.SCHEMA is None:
+                Google.CRAWL_MODE = "detail"
+
+    def listing(self, body):
+        # Fresh scraper per page so run-wide de-duplication doesn't hide links
+        scraper = self.google.Scraper("property management in Corpus, OH", "")
+        return scraper.get_listings(scraper.search_terms, body)
+
+    def detail(self, body):
+        scraper = self.google.Scraper("property management in Corpus, OH", "")
+        return scraper.parse_details(body)
+
+    @staticmethod
+    def cross_check(docs):
+        """Listing pages where the byte scanner and the DOM find different CIDs"""
+        from listing_scan import scan_cids, dom_cids
+        diffs = []
+        for name, body in docs.items():
+            scanned, dom = scan_cids(body), dom_cids(body)
+            if scanned is None:
+                diffs.append(f"listing/{name}: byte scan rejected the page, DOM found {len(dom)} cards")
+            elif scanned != dom:
+                diffs.append(f"listing/{name}: byte scan found {len(scanned)} CIDs, DOM {len(dom)} "
+                             f"({len(set(dom) - set(scanned))} missing)")
+        return diffs
+
+    def extract(self, documents):
+        return {stage: {name: getattr(self, stage)(body) for name, body in docs.items()}
+                for stage, docs in documents.items()}
+
+    def measure(self, stage, docs, rounds=3, min_seconds=0.5):
+        """Best documents/sec over several timed rounds, and peak Python heap (tracemalloc) for one pass"""
+        parse = getattr(self, stage)
+        bodies = list(docs.values())
+        best = 0.0
+        for _ in range(rounds):
+            passes, started = 0, time.perf_counter()
+            while True:
+                for body in bodies:
+                    parse(body)
+                passes += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= min_seconds:
+                    break
+            best = max(best, passes * len(bodies) / elapsed)
+        tracemalloc.start()
+        for body in bodies:
+            parse(body)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {"docs_per_sec": round(best, 1),
+                "peak_kb_per_pass": round(peak / 1024, 1)}
+
+
+def diff_fields(expected, actual):
+    """Human-readable differences between expected and extracted output"""
+    diffs = []
+    for stage in STAGES:
+        want, got = expected.get(stage, {}), actual.get(stage, {})
+        for name in sorted(set(want) | set(got)):
+            if name not in got:
+                diffs.append(f"{stage}/{name}: missing from corpus")
+            elif name not in want:
+                diffs.append(f"{stage}/{name}: no expected output (run --update)")
+            elif stage == "detail":
+                for field in sorted(set(want[name]) | set(got[name])):
+                    if want[name].get(field) != got[name].get(field):
+                        diffs.append(f"detail/{name} {field}: {want[name].get(field)!r} -> {got[name].get(field)!r}")
+            elif want[name] != got[name]:
+                lost = [link for link in want[name] if link not in got[name]]
+                added = [link for link in got[name] if link not in want[name]]
+                diffs.append(f"listing/{name}: {len(want[name])} -> {len(got[name])} links "
+                             f"({len(lost)} lost, {len(added)} new)")
+    return diffs
+
+
+def read_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser correctness and throughput gate over the fixture corpus")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--parser", choices=["lxml", "selector"], help="override the parser setting")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="fail when docs/sec drops more than this fraction below the baseline")
+    parser.add_argument("--no-perf", dest="perf", action="store_false", help="only check extracted fields")
+    parser.add_argument("--update", action="store_true", help="rewrite expected.json and baseline.json")
+    parser.add_argument("--import-archive", help="add 200 responses from a replay archive to --corpus and exit")
+    args = parser.parse_args()
+
+    corpus = os.path.abspath(args.corpus)
+    if args.import_archive:
+        import_archive(os.path.abspath(args.import_archive), corpus)
+        return 0
+
+    documents = load_documents(corpus)
+    if not any(documents.values()):
+        parser.error(f"no documents under {corpus}")
+    expected_path = os.path.join(corpus, "expected.json")
+    baseline_path = os.path.join(corpus, "baseline.json")
+
+    sys.path.insert(0, SCRIPT_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="gmb_gate_"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        gate = Gate(args.parser)
+        actual = gate.extract(documents)
+
+    if args.update:
+        write_json(expected_path, actual)
+        print(f"[GATE] Wrote expected output for {sum(len(d) for d in documents.values())} documents")
+    expected = read_json(expected_path, {})
+    diffs = diff_fields(expected, actual) + gate.cross_check(documents["listing"])
+    for line in diffs:
+        print(f"[DIFF] {line}")
+
+    failures = len(diffs)
+    if args.perf:
+        baseline = read_json(baseline_path, {})
+        results = {}
+        for stage in STAGES:
+            if not documents[stage]:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[stage] = gate.measure(stage, documents[stage])
+            result, base = results[stage], baseline.get(stage)
+            line = (f"[GATE] {stage}: {len(documents[stage])} docs, {result['docs_per_sec']:.0f} docs/s, "
+                    f"peak {result['peak_kb_per_pass']:.0f} KB Python heap per pass")
+            if base and not args.update:
+                change = result["docs_per_sec"] / base["docs_per_sec"] - 1
+                line += f" ({change:+.0%} vs baseline {base['docs_per_sec']:.0f})"
+                if change < -args.threshold:
+                    line += " REGRESSION"
+                    failures += 1
+            print(line)
+        if args.update:
+            write_json(baseline_path, results)
+            print(f"[GATE] Wrote throughput baseline to {baseline_path}")
+
+    if failures:
+        print(f"[GATE] FAILED: {failures} problem(s)")
+        return 1
+    print("[GATE] OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Fetch Path Regression Checks
+Runs the scraper's fetch, cache and parse pool code outside the parser gate; fails when a streamed,
+projected body is served from the detail cache or a pooled parse differs from the fetch thread's
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+from parser_gate import DEFAULT_CORPUS, load_documents
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def stream_cache_check(google):
+    """Problems when a projected, streamed fetch is followed by a full fetch of the same page.
+
+    An early-aborted body only holds the projected fields, so it must never
+    reach the detail cache and be served back to a run that wants them all.
+    """
+    from mock_google import MockGoogle
+    from response_cache import DetailCache
+    from scheduler import RequestScheduler
+    mock = MockGoogle(detail_kb=200)
+    mock.start()
+    saved = (google.DETAIL_CACHE, google.STREAM_DETAILS, google.proxy, google.SCHEDULER)
+    try:
+        google.DETAIL_CACHE = DetailCache(os.path.join("stream_check", "details"))
+        google.STREAM_DETAILS, google.proxy = 1, 0
+        google.SCHEDULER = RequestScheduler(0, 1, 0, 0)
+        cid = "1000003"
+        url = google.details_url_t.replace(google.GOOGLE_BASE_URL, mock.base_url).format(q="x", id=cid)
+        streamed = google.Scraper("x in Corpus, OH", "", fields="Name").get_body(url)
+        google.Scraper("x in Corpus, OH", "").get_body(url)
+    finally:
+        google.DETAIL_CACHE, google.STREAM_DETAILS, google.proxy, google.SCHEDULER = saved
+        mock.stop()
+    if mock.stats["detail"] < 2:
+        return [f"stream/{cid}: full fetch was served the {len(streamed)} byte projected body from the cache"]
+    return []
+
+
+def pool_check(google, docs, columns=("Name", "Phone Number")):
+    """Detail pages a ParsePool parses differently from the fetch thread, with a column projection"""
+    from parse_pool import ParsePool
+    pool = ParsePool(1, google.PARSER, google.SCHEMA)
+    diffs = []
+    try:
+        for name, body in docs.items():
+            pooled = pool.parse(body, set(columns))
+            local = (google.extract_details(body, google.SCHEMA, set(columns)) if pool.schema
+                     else google.selector_details(body))
+            if pooled != local:
+                diffs.append(f"pool/{name}: {local!r} -> {pooled!r}")
+    except Exception as e:
+        diffs.append(f"pool: parse failed: {e!r}")
+    finally:
+        pool.close()
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch, cache and parse pool checks outside the parser gate")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="detail pages for the parse pool check")
+    parser.add_argument("--verbose", action="store_true", help="show scraper output")
+    args = parser.parse_args()
+
+    documents = load_documents(os.path.abspath(args.corpus))
+    if not documents["detail"]:
+        parser.error(f"no detail pages under {args.corpus}")
+    sys.path.insert(0, SCRIPT_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="gmb_checks_"))
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        # Imported here so the scraper's relative cache files land in the temp dir
+        import Google
+        Google.DETAIL_CACHE = None
+        Google.PARSE_POOL = None
+        # Streaming needs the extraction schema, which only the lxml parser loads
+        Google.PARSER = "lxml"
+        Google.SCHEMA = Google.SCHEMA or Google.load_schema(Google.EXTRACTION_SCHEMA)
+        problems = stream_cache_check(Google) + pool_check(Google, documents["detail"])
+
+    for line in problems:
+        print(f"[CHECK] {line}")
+    if problems:
+        print(f"[CHECK] FAILED: {len(problems)} problem(s)")
+        return 1
+    print("[CHECK] OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
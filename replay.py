@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Record & Replay
+Archive every HTTP response to a compressed file and serve it back offline
+"""
+
+import base64
+import collections
+import datetime
+import gzip
+import json
+import os
+import threading
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class HttpArchive:
+    """Gzip-compressed JSON-lines archive of raw HTTP responses.
+
+    In ``record`` mode every response is appended (URL, status, headers and
+    the decoded body) as it arrives. In ``replay`` mode the archive is loaded
+    up front and responses are handed back by URL in the order they were
+    recorded; once a URL's recordings run out its last response is repeated.
+    A URL that was never recorded gets an empty 404. A recording cut short
+    by a crash replays up to its last complete response.
+    """
+
+    def __init__(self, path, mode="record"):
+        self.path = path
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+        self.missing = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._entries = {}
+
+        if mode == "record":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = gzip.open(path, "ab")
+        elif mode == "replay":
+            self._load()
+        else:
+            raise ValueError(f"Unknown archive mode: {mode}")
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def _load(self):
+        entries = collections.defaultdict(collections.deque)
+        truncated = False
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    # record() ends every entry with a newline; one without it was cut off mid-write
+                    if not line.endswith("\n"):
+                        truncated = True
+                        break
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry["url"]].append(entry)
+            except (EOFError, zlib.error):
+                # A recording that was interrupted: keep everything before the damaged tail
+                truncated = True
+        self._entries = dict(entries)
+        total = sum(len(queue) for queue in self._entries.values())
+        print(f"[REPLAY] Loaded {total} responses for {len(self._entries)} URLs from {self.path}"
+              f"{' (truncated recording, damaged tail skipped)' if truncated else ''}")
+
+    def record(self, url, response):
+        """Append one live response to the archive"""
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    def replay(self, url):
+        """Recorded response for this URL as a requests.Response"""
+        with self._lock:
+            queue = self._entries.get(url)
+            if not queue:
+                self.missing += 1
+                entry = {"url": url, "status": 404, "headers": {}, "body": "", "elapsed": 0}
+                print(f"[REPLAY] No recorded response for {url}")
+            else:
+                entry = queue.popleft() if len(queue) > 1 else queue[0]
+                self.replayed += 1
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(entry["body"])
+        response.elapsed = datetime.timedelta(seconds=entry.get("elapsed", 0))
+        return response
+
+    def print_stats(self):
+        if self.mode == "record":
+            print(f"[RECORD] {self.recorded} responses archived to {self.path}")
+        else:
+            print(f"[REPLAY] {self.replayed} responses served, {self.missing} URLs not in archive")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Detail Page Cache
+Compressed, content-addressed on-disk cache of detail pages keyed by business CID
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+CID_PATTERN = re.compile(r"ludocids:(\d+)")
+
+
+def detail_cid(url):
+    """Business CID of a details_url_t URL, or None for any other URL"""
+    match = CID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+class DetailCache:
+    """Detail page bodies stored once per content hash, indexed by CID.
+
+    Layout under ``path``:
+        index.sqlite        cid -> digest, fetch time, raw size
+        objects/ab/abcd...  zlib-compressed body named by its sha256
+
+    Entries older than ``ttl_hours`` are misses. When the compressed objects
+    exceed ``max_mb`` the oldest entries are evicted first.
+    """
+
+    def __init__(self, path="cache/details", ttl_hours=168, max_mb=500):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(path, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                cid TEXT PRIMARY KEY, digest TEXT NOT NULL,
+                stored_at REAL NOT NULL, raw_size INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY, size INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS entries_age ON entries (stored_at);
+        """)
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def _object_path(self, digest):
+        return os.path.join(self.path, "objects", digest[:2], digest)
+
+    def contains(self, cid):
+        """True if a fresh entry exists (does not count as a hit or miss)"""
+        with self._lock:
+            row = self._db.execute("SELECT stored_at FROM entries WHERE cid = ?", (cid,)).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl
+
+    def get(self, cid):
+        """Cached body for this CID, or None if missing or expired"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, stored_at, raw_size FROM entries WHERE cid = ?", (cid,)).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+        try:
+            with open(self._object_path(row[0]), "rb") as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            with self._lock:
+                self.misses += 1
+                self._db.execute("DELETE FROM entries WHERE cid = ?", (cid,))
+                self._db.commit()
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += row[2]
+        return body
+
+    def put(self, cid, body):
+        """Store a freshly fetched body for this CID"""
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        with self._lock:
+            known = self._db.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone()
+            if not known:
+                data = zlib.compress(body, 6)
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                tmp_path = f"{object_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, object_path)
+                self._db.execute("INSERT INTO objects (digest, size) VALUES (?, ?)", (digest, len(data)))
+                self._size += len(data)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (cid, digest, stored_at, raw_size) VALUES (?, ?, ?, ?)",
+                (cid, digest, time.time(), len(body)))
+            if self._size > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Drop the oldest tenth of entries at a time until back under the cap
+        while self._size > self.max_bytes:
+            count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if not count:
+                break
+            self._db.execute(
+                "DELETE FROM entries WHERE cid IN "
+                "(SELECT cid FROM entries ORDER BY stored_at LIMIT ?)", (max(1, count // 10),))
+            orphans = self._db.execute(
+                "SELECT digest, size FROM objects WHERE digest NOT IN (SELECT digest FROM entries)").fetchall()
+            for digest, size in orphans:
+                try:
+                    os.remove(self._object_path(digest))
+                except OSError:
+                    pass
+                self._size -= size
+            self._db.executemany("DELETE FROM objects WHERE digest = ?", [(d,) for d, _ in orphans])
+
+    def print_stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        print(f"[CACHE] Detail pages: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate), "
+              f"{self.bytes_saved / (1024 * 1024):.2f} MB not downloaded, "
+              f"{self._size / (1024 * 1024):.2f} MB on disk")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
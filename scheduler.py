@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Request Scheduler
+Token buckets per target host and per proxy that pace every outgoing request
+"""
+
+import concurrent.futures
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    reserve() atomically takes a token and returns the monotonic time at
+    which the caller may send. When the bucket is empty the balance goes
+    negative, so concurrent callers get distinct, evenly spaced slots rather
+    than all waking up together. A rate of 0 disables the pacing, but a
+    pause() still holds every reservation until its deadline.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def reserve(self):
+        """Take one token; return the monotonic time it becomes usable"""
+        now = time.monotonic()
+        with self._lock:
+            if self.rate <= 0:
+                return max(now, self._paused_until)
+            self._refill(now)
+            self._tokens -= 1
+            start = now if self._tokens >= 0 else now + (-self._tokens) / self.rate
+            return max(start, self._paused_until)
+
+    def pause(self, seconds):
+        """Hold every reservation until ``seconds`` from now.
+
+        Only ever moves the deadline later, so overlapping pauses don't add
+        up. With a rate, the token debt also spaces out the requests that
+        were waiting instead of releasing them together at the deadline.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._paused_until = max(self._paused_until, now + seconds)
+            if self.rate > 0:
+                self._refill(now)
+                self._tokens = min(self._tokens, 0, -seconds * self.rate)
+
+
+class RequestScheduler:
+    """Central pacing for all HTTP traffic.
+
+    A request must hold a slot in both its host bucket and its proxy bucket,
+    so the proxy exit is never driven harder than ``proxy_rate`` no matter how
+    many hosts are being crawled.
+    """
+
+    def __init__(self, host_rate=3, host_burst=3, proxy_rate=6, proxy_burst=6):
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.proxy_rate = proxy_rate
+        self.proxy_burst = proxy_burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.requests_scheduled = 0
+        self.total_wait = 0.0
+
+    def _bucket(self, key, rate, burst):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate, burst)
+            return bucket
+
+    def _buckets_for(self, url, proxies=None):
+        buckets = [self._bucket(("host", urlsplit(url).netloc), self.host_rate, self.host_burst)]
+        proxy_url = (proxies or {}).get("https") or (proxies or {}).get("http")
+        if proxy_url:
+            buckets.append(self._bucket(("proxy", proxy_url), self.proxy_rate, self.proxy_burst))
+        return buckets
+
+    def reserve(self, url, proxies=None):
+        """Reserve a send slot for this URL; return seconds until it starts"""
+        start = max(bucket.reserve() for bucket in self._buckets_for(url, proxies))
+        delay = max(0.0, start - time.monotonic())
+        with self._lock:
+            self.requests_scheduled += 1
+            self.total_wait += delay
+        return delay
+
+    def wait(self, url, proxies=None):
+        """Block the calling thread until its reserved slot"""
+        delay = self.reserve(url, proxies)
+        if delay > 0:
+            time.sleep(delay)
+
+    def limit_host(self, url, rate, burst=1):
+        """Give the host of url its own rate and burst instead of host_rate/host_burst"""
+        with self._lock:
+            self._buckets[("host", urlsplit(url).netloc)] = TokenBucket(rate, burst)
+
+    def pause(self, url, seconds):
+        """Cool down one host: no request to it starts for ``seconds``"""
+        self._bucket(("host", urlsplit(url).netloc), self.host_rate, self.host_burst).pause(seconds)
+
+    def print_stats(self):
+        with self._lock:
+            scheduled, waited = self.requests_scheduled, self.total_wait
+        average = waited / scheduled if scheduled else 0.0
+        print(f"[SCHEDULER] {scheduled} requests paced, average wait {average:.2f}s")
+
+
+class SlotDispatcher:
+    """Hands work to an executor when its reserved send slot arrives.
+
+    submit(delay, fn, ...) returns a future at once; a single timer thread
+    keeps the pending jobs in a heap and submits each one when its delay is
+    up. A paced request therefore holds no worker thread until it may be
+    sent, the threaded engine's counterpart of awaiting the slot on the
+    event loop.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self._heap = []
+        self._order = itertools.count()
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, delay, fn, *args):
+        if delay <= 0:
+            return self.executor.submit(fn, *args)
+        future = concurrent.futures.Future()
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._order), future, fn, args))
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        if self._closed:
+                            return
+                        self._cond.wait()
+                        continue
+                    remaining = self._heap[0][0] - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                _, _, future, fn, args = heapq.heappop(self._heap)
+            self._start(future, fn, args)
+
+    def _start(self, future, fn, args):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            inner = self.executor.submit(fn, *args)
+        except BaseException as e:
+            future.set_exception(e)
+            return
+
+        def relay(done):
+            error = done.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result())
+
+        inner.add_done_callback(relay)
+
+    def close(self):
+        """Wait until every pending job has been handed to the executor"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
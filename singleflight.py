@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Request Coalescing
+Concurrent calls for the same key share one in-flight request instead of each sending their own
+"""
+
+import concurrent.futures
+import threading
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; later callers wait for its result.
+
+    The first caller for a key (the leader) runs the function. Callers that
+    arrive while it is running block on the leader's future and get the same
+    result or exception. Nothing is cached: once the leader returns, the
+    next call for that key runs again, so put a cache lookup inside the
+    function to catch the caller that just missed the flight.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.collapsed = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = concurrent.futures.Future()
+            else:
+                self.collapsed += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def print_stats(self):
+        if self.collapsed:
+            print(f"[SINGLEFLIGHT] {self.name}: {self.calls} calls, {self.collapsed} duplicate requests collapsed")
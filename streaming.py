@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Streaming Early Abort
+Read a response body in chunks and stop once every field marker has gone by or a byte cap is hit
+"""
+
+CHUNK_SIZE = 8192
+
+
+class MarkerWatch:
+    """Decides when enough of a detail page has arrived.
+
+    Done once every marker has been seen plus ``tail_bytes`` more (so the
+    element the last marker opened is complete), or once ``max_bytes`` of
+    decoded body have arrived. Markers split across chunks are still found.
+    """
+
+    def __init__(self, markers, tail_bytes=2048, max_bytes=0):
+        self.markers = [m.encode("utf-8") if isinstance(m, str) else m for m in markers]
+        self.tail_bytes = tail_bytes
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.reason = None
+        self._missing = set(self.markers)
+        self._overlap = max((len(m) for m in self.markers), default=1) - 1
+        self._window = b""
+        self._complete_at = None
+
+    def feed(self, chunk):
+        """Account for one decoded chunk; True when reading can stop"""
+        self.received += len(chunk)
+        if self._missing:
+            window = self._window + chunk
+            self._missing = {m for m in self._missing if m not in window}
+            self._window = window[-self._overlap:] if self._overlap else b""
+            if not self._missing:
+                self._complete_at = self.received
+        if self._complete_at is not None and self.received - self._complete_at >= self.tail_bytes:
+            self.reason = "markers"
+            return True
+        if self.max_bytes and self.received >= self.max_bytes:
+            self.reason = "byte cap"
+            return True
+        return False
+
+
+def read_until(response, watch, chunk_size=CHUNK_SIZE):
+    """Fill response.content from a stream=True response, stopping when watch says so.
+
+    Sets response.aborted, response.bytes_saved (compressed bytes not
+    downloaded) and closes the connection on an early stop so its unread
+    remainder is discarded. A chunked response, as Google sends, never says
+    how long it is, so for an early stop without a Content-Length
+    bytes_saved is None: unknown, not zero.
+    """
+    chunks = []
+    aborted = False
+    for chunk in response.raw.stream(chunk_size, decode_content=True):
+        chunks.append(chunk)
+        if watch.feed(chunk):
+            aborted = True
+            break
+
+    read = response.raw.tell()
+    length = response.headers.get("Content-Length")
+    if not aborted:
+        response.bytes_saved = 0
+    elif length and length.isdigit():
+        response.bytes_saved = max(0, int(length) - read)
+    else:
+        response.bytes_saved = None
+    response.aborted = aborted
+    # One copy into the final bytes instead of growing a buffer and copying it again
+    response._content = b"".join(chunks)
+    response._content_consumed = True
+    if aborted:
+        # An unread connection can't go back to the pool
+        response.raw.close()
+    response.close()
+    return response
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Wire Accounting
+Estimate the bytes a request really moves through the proxy, not the decoded body size
+"""
+
+import base64
+import math
+from urllib.parse import urlsplit, unquote
+
+# Full TLS handshake, both directions, with a typical Google certificate chain
+TLS_HANDSHAKE_BYTES = 6500
+# Per-record overhead: 5-byte header + 16-byte AEAD tag + padding/type, per 16 KB record
+TLS_RECORD_OVERHEAD = 29
+TLS_RECORD_SIZE = 16384
+# "HTTP/1.1 200 Connection established\r\n\r\n" from the proxy
+CONNECT_RESPONSE_BYTES = 39
+
+
+def _header_block_bytes(first_line, headers):
+    size = len(first_line) + 2
+    for name, value in headers.items():
+        size += len(str(name)) + 2 + len(str(value)) + 2
+    return size + 2
+
+
+def _tls_records(payload_bytes):
+    return math.ceil(payload_bytes / TLS_RECORD_SIZE) if payload_bytes else 0
+
+
+def _proxy_authorization(proxy_url):
+    parts = urlsplit(proxy_url)
+    if not parts.username:
+        return None
+    credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+    return "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+
+
+def connect_bytes(url, proxy_url):
+    """Bytes of the CONNECT exchange that opens a tunnel through the proxy"""
+    target = urlsplit(url)
+    authority = f"{target.hostname}:{target.port or 443}"
+    headers = {"Host": authority}
+    auth = _proxy_authorization(proxy_url)
+    if auth:
+        headers["Proxy-Authorization"] = auth
+    return _header_block_bytes(f"CONNECT {authority} HTTP/1.1", headers) + CONNECT_RESPONSE_BYTES
+
+
+def request_bytes(response, proxy_url=None):
+    """Request line, headers and body as sent for this response's request"""
+    request = response.request
+    target = urlsplit(request.url)
+    headers = dict(request.headers)
+    if proxy_url and target.scheme == "http":
+        # Plain HTTP through a proxy: absolute URI and credentials on every request
+        path = request.url
+        auth = _proxy_authorization(proxy_url)
+        if auth:
+            headers["Proxy-Authorization"] = auth
+    else:
+        path = target.path or "/"
+        if target.query:
+            path += "?" + target.query
+    headers.setdefault("Host", target.netloc)
+    body = request.body or b""
+    return _header_block_bytes(f"{request.method} {path} HTTP/1.1", headers) + len(body)
+
+
+def response_bytes(response):
+    """Status line, headers and the body exactly as it came off the socket"""
+    status = f"HTTP/1.1 {response.status_code} {response.reason or ''}".rstrip()
+    header_bytes = _header_block_bytes(status, response.headers)
+    body_bytes = None
+    raw = getattr(response, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            body_bytes = raw.tell()
+        except Exception:
+            body_bytes = None
+    if not body_bytes:
+        length = response.headers.get("Content-Length")
+        body_bytes = int(length) if length and length.isdigit() else len(response.content)
+    return header_bytes + body_bytes
+
+
+def wire_bytes(response, proxy_url=None, new_connections=0):
+    """Total estimated bytes on the wire for one request/response pair.
+
+    Counts request and response headers, the encoded (compressed) body,
+    TLS record framing for HTTPS, and for each connection this request had
+    to open: the proxy CONNECT exchange and a full TLS handshake. TCP/IP
+    packet headers are not included.
+    """
+    sent = request_bytes(response, proxy_url)
+    received = response_bytes(response)
+    total = sent + received
+    if urlsplit(response.request.url).scheme == "https":
+        total += (_tls_records(sent) + _tls_records(received)) * TLS_RECORD_OVERHEAD
+        total += new_connections * TLS_HANDSHAKE_BYTES
+        if proxy_url:
+            total += new_connections * connect_bytes(response.request.url, proxy_url)
+    return total